@@ -0,0 +1,169 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from gift_recommender.catalog_loader import catalog_version
+from gift_recommender.compact_catalog import categorize_enums
+from gift_recommender.encoding import add_tag_bitmasks
+from gift_recommender.indexes import age_window_mask, build_gift_index, match_social
+from gift_recommender.scoring import compute_match_scores, recommend_gifts, select_top_k
+
+from .synthetic import catalog_vocabularies, synthetic_catalog, synthetic_profiles
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+# Distinct score vectors the top_k stage cycles through
+TOP_K_SAMPLES = 8
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {"p50_ms": round(p50, 4), "p95_ms": round(p95, 4), "p99_ms": round(p99, 4)}
+
+
+def _peak_bytes(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def time_stage(name: str, size: int, calls: List[Callable[[], Any]]) -> Dict[str, Any]:
+    # One call per profile; latency percentiles, throughput, and the peak
+    # traced allocation of a single (first) call
+    samples = []
+    start = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    total = time.perf_counter() - start
+    result = {"catalog_size": size, "stage": name, "queries": len(calls)}
+    result.update(_percentiles(samples))
+    result["throughput_qps"] = round(len(calls) / total, 2) if total else None
+    result["peak_mem_bytes"] = _peak_bytes(calls[0])
+    return result
+
+
+def bench_size(size: int, queries: int, seed: int, top_k: int, vocab: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    t0 = time.perf_counter()
+    df = add_tag_bitmasks(categorize_enums(synthetic_catalog(size, seed=seed, vocab=vocab)))
+    df.attrs["catalog_version"] = catalog_version(df)
+    build_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = build_gift_index(df)
+    index_s = time.perf_counter() - t0
+    profiles = synthetic_profiles(queries, seed=seed + 1, vocab=vocab).to_dict("records")
+    trend = df["social_trend_score"].to_numpy()
+    names = df["name"].to_numpy()
+    ids = df.index.to_numpy()
+
+    def scores_for(p: Dict[str, Any]) -> np.ndarray:
+        return compute_match_scores(df, p["age"], p["gender"], p["professions"], p["hobbies"], "", index=index)
+
+    # top_k is timed on a few precomputed score vectors, cycled over the
+    # queries; one full-catalog vector per query would not fit in memory at
+    # the larger sizes
+    precomputed = [scores_for(p) for p in profiles[:TOP_K_SAMPLES]]
+
+    def full_scan(p: Dict[str, Any]) -> pd.DataFrame:
+        # What recommend_gifts(index=...) does without candidate pruning:
+        # score every gift in the age window, then take the top_k
+        in_window = age_window_mask(index.ages, p["age"])
+        if not in_window.any():
+            in_window[:] = True
+        rows = df[in_window].copy()
+        rows["match_score"] = compute_match_scores(
+            rows, p["age"], p["gender"], p["professions"], p["hobbies"], p["social_interests"], index=index
+        )
+        top = select_top_k(
+            rows["match_score"].to_numpy(),
+            rows["social_trend_score"].to_numpy(),
+            rows["name"].to_numpy(),
+            rows.index.to_numpy(),
+            top_k,
+        )
+        return rows.iloc[top]
+
+    results = [
+        {"catalog_size": size, "stage": "catalog_build", "seconds": round(build_s, 4)},
+        {"catalog_size": size, "stage": "index_build", "seconds": round(index_s, 4)},
+        time_stage("age_filter", size, [lambda p=p: age_window_mask(index.ages, p["age"]) for p in profiles]),
+        time_stage("scoring", size, [lambda p=p: scores_for(p) for p in profiles]),
+        time_stage(
+            "social_match",
+            size,
+            [
+                lambda p=p: match_social(index.tags, p["social_interests"] or "gaming")
+                for p in profiles
+            ],
+        ),
+        time_stage(
+            "top_k",
+            size,
+            [
+                lambda s=precomputed[i % len(precomputed)]: select_top_k(s, trend, names, ids, top_k)
+                for i in range(len(profiles))
+            ],
+        ),
+        time_stage(
+            "recommend_gifts",
+            size,
+            [
+                lambda p=p: recommend_gifts(
+                    df, p["age"], p["gender"], p["professions"], p["hobbies"], p["social_interests"], top_k, index=index
+                )
+                for p in profiles
+            ],
+        ),
+        time_stage("full_scan", size, [lambda p=p: full_scan(p) for p in profiles]),
+    ]
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation pipeline on synthetic catalogs.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma-separated catalog sizes")
+    parser.add_argument("--queries", type=int, default=200, help="profiles per catalog size")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    vocab = catalog_vocabularies()
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        print(f"benchmarking {size:,} gifts...", file=sys.stderr)
+        results.extend(bench_size(size, args.queries, args.seed, args.top_k, vocab))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "queries": args.queries,
+            "top_k": args.top_k,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
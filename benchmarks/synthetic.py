@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from gift_recommender import build_gift_dataset
+from gift_recommender.catalog_loader import CATALOG_COLUMNS
+
+# Sidebar options in app.main()
+PROFESSION_OPTIONS = ["Student", "Engineer", "Teacher", "Doctor", "Artist"]
+HOBBY_OPTIONS = ["Gaming", "Reading", "Sports", "Cooking", "Travel", "Music"]
+GENDER_OPTIONS = ["Male", "Female", "Other"]
+
+
+def catalog_vocabularies() -> Dict[str, List[str]]:
+    # Tag and enum vocabularies of the built-in dataset
+    base = build_gift_dataset()
+    vocab = {
+        field: sorted({tag for tags in base[field] for tag in tags})
+        for field in ("profession_match", "hobby_tags", "social_tags")
+    }
+    vocab["gender_pref"] = sorted(base["gender_pref"].unique())
+    vocab["price_range"] = sorted(base["price_range"].unique())
+    vocab["image_url"] = sorted(base["image_url"].unique())
+    return vocab
+
+
+def _sample_lists(rng: np.random.Generator, vocab: List[str], n: int, low: int, high: int) -> List[List[str]]:
+    sizes = rng.integers(low, high + 1, size=n)
+    picks = rng.integers(0, len(vocab), size=int(sizes.sum()))
+    vocab_arr = np.asarray(vocab, dtype=object)
+    out, start = [], 0
+    for size in sizes:
+        # duplicates collapse, like a hand-written tag list would
+        out.append(list(dict.fromkeys(vocab_arr[picks[start : start + size]])))
+        start += size
+    return out
+
+
+def synthetic_catalog(n: int, seed: int = 0, vocab: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    # n gifts with the built-in schema; same seed, same catalog
+    rng = np.random.default_rng(seed)
+    vocab = vocab or catalog_vocabularies()
+    min_age = rng.integers(1, 60, size=n)
+    df = pd.DataFrame(
+        {
+            "name": [f"Gift {i}" for i in range(n)],
+            "min_age": min_age,
+            "max_age": min_age + rng.integers(5, 50, size=n),
+            "gender_pref": rng.choice(vocab["gender_pref"], size=n),
+            "profession_match": _sample_lists(rng, vocab["profession_match"], n, 1, 5),
+            "hobby_tags": _sample_lists(rng, vocab["hobby_tags"], n, 1, 4),
+            "social_tags": _sample_lists(rng, vocab["social_tags"], n, 1, 4),
+            "social_trend_score": np.round(rng.uniform(6.0, 9.8, size=n), 1),
+            "price_range": rng.choice(vocab["price_range"], size=n),
+            "image_url": rng.choice(vocab["image_url"], size=n),
+            "buy_link": [f"https://example.com/gift/{i}" for i in range(n)],
+            "why_base": "Synthetic gift for benchmarking.",
+        }
+    )
+    return df[list(CATALOG_COLUMNS)]
+
+
+def synthetic_profiles(n: int, seed: int = 1, vocab: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    # Sidebar-shaped profiles; about half carry social-interest text
+    rng = np.random.default_rng(seed)
+    vocab = vocab or catalog_vocabularies()
+    social_words = sorted({w for tag in vocab["social_tags"] for w in tag.split("-")})
+    texts = []
+    for has_text in rng.random(n) < 0.5:
+        if has_text:
+            words = rng.choice(social_words, size=int(rng.integers(1, 4)), replace=False)
+            texts.append(" ".join(words))
+        else:
+            texts.append("")
+    return pd.DataFrame(
+        {
+            "age": rng.integers(1, 101, size=n),
+            "gender": rng.choice(GENDER_OPTIONS, size=n),
+            "professions": _sample_lists(rng, PROFESSION_OPTIONS, n, 0, 2),
+            "hobbies": _sample_lists(rng, HOBBY_OPTIONS, n, 0, 3),
+            "social_interests": texts,
+        }
+    )
@@ -0,0 +1,51 @@
+# Streamlit-free recommender core. Submodules (and numpy/pandas with them)
+# are imported on first attribute access, so `import gift_recommender` stays
+# cheap for short-lived workers; see import_budget.py.
+import importlib
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "build_gift_dataset": "dataset",
+    "load_gift_catalog": "catalog",
+    "build_gift_df": "catalog",
+    "CatalogError": "catalog_loader",
+    "load_catalog": "catalog_loader",
+    "catalog_version": "catalog_loader",
+    "CatalogManager": "catalog_manager",
+    "CatalogSnapshot": "catalog_manager",
+    "CompactCatalog": "compact_catalog",
+    "compile_catalog": "compiled_catalog",
+    "load_compiled": "compiled_catalog",
+    "GiftIndex": "indexes",
+    "build_gift_index": "indexes",
+    "TagMatcher": "tag_matcher",
+    "compute_match_score": "scoring",
+    "compute_match_scores": "scoring",
+    "select_top_k": "scoring",
+    "recommend_gifts": "scoring",
+    "profile_key": "scoring",
+    "cached_recommend_gifts": "scoring",
+    "TTLCache": "result_cache",
+    "SharedCache": "shared_cache",
+    "recommend_batch": "batch",
+    "iter_batch_recommendations": "batch",
+    "ProfileError": "batch",
+    "ThumbnailCache": "thumbnails",
+    "MaterializedTable": "materialized",
+    "build_table": "materialized",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,296 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .catalog_manager import build_snapshot
+from .catalog_loader import CatalogError, parse_tag_list
+from .compact_catalog import catalog_column, name_order
+from .indexes import (
+    AGE_FIT_BONUS,
+    AGE_MISS_PENALTY,
+    GENDER_MATCH_BONUS,
+    HOBBY_MATCH_WEIGHT,
+    PROFESSION_MATCH_WEIGHT,
+    SOCIAL_TAG_WEIGHT,
+    GiftIndex,
+    SocialMatches,
+    build_gift_index,
+    match_social,
+)
+from .scoring import select_top_k
+
+
+# Upper bound on profiles x gifts cells scored at once (~8 bytes each per
+# intermediate matrix)
+DEFAULT_CHUNK_CELLS = 4_000_000
+
+
+# -----------------------------
+# Matrix Scoring
+# -----------------------------
+def _unpack_age_rows(bits: np.ndarray, first_age: int, ages: np.ndarray, size: int) -> np.ndarray:
+    rows = ages - first_age
+    inside = (rows >= 0) & (rows < len(bits))
+    out = np.zeros((len(ages), size), dtype=bool)
+    if inside.any():
+        out[inside] = np.unpackbits(bits[rows[inside]], axis=1, count=size).astype(bool)
+    return out
+
+
+@dataclass(frozen=True)
+class CatalogArrays:
+    # Per-gift arrays score_profiles needs that depend only on the catalog;
+    # built once per run instead of once per chunk of profiles
+    trend: np.ndarray
+    gender_any: np.ndarray
+    # gender_pref lowercased, as codes into gender_names
+    gender_codes: np.ndarray
+    gender_names: List[str]
+
+
+def catalog_arrays(df: pd.DataFrame) -> CatalogArrays:
+    gender_pref = df["gender_pref"].astype(str)
+    codes, names = pd.factorize(gender_pref.str.lower())
+    return CatalogArrays(
+        trend=df["social_trend_score"].to_numpy(dtype=np.float64),
+        gender_any=(gender_pref == "Any").to_numpy(),
+        gender_codes=codes,
+        gender_names=list(names),
+    )
+
+
+def _overlap_counts(postings: Dict[str, np.ndarray], wanted: List[List[str]], size: int) -> np.ndarray:
+    # Distinct wanted tags per gift, from the tag -> positions index; the
+    # same counts as the bitmask AND + popcount, without a pass over every
+    # gift's bits per profile
+    counts = np.zeros((len(wanted), size), dtype=np.int64)
+    for row, tags in enumerate(wanted):
+        for tag in set(tags):
+            if tag in postings:
+                counts[row, postings[tag]] += 1
+    return counts
+
+
+def score_profiles(
+    df: pd.DataFrame,
+    index: GiftIndex,
+    profiles: pd.DataFrame,
+    arrays: Optional[CatalogArrays] = None,
+) -> np.ndarray:
+    # profiles x gifts match_score matrix, with gifts outside a profile's age
+    # window set to -inf. Terms are added in compute_match_scores order so
+    # every cell equals what recommend_gifts computes for that profile.
+    if arrays is None:
+        arrays = catalog_arrays(df)
+    n = len(df)
+    ages = profiles["age"].to_numpy(dtype=np.int64)
+    scores = np.repeat(arrays.trend[None, :], len(profiles), axis=0)
+
+    fits = _unpack_age_rows(index.ages.fit_bits, index.ages.first_age, ages, n)
+    scores += np.where(fits, AGE_FIT_BONUS, AGE_MISS_PENALTY)
+
+    genders = profiles["gender"].str.lower().to_numpy()
+    for gender in np.unique(genders):
+        gender_ok = arrays.gender_any.copy()
+        if gender in arrays.gender_names:
+            gender_ok |= arrays.gender_codes == arrays.gender_names.index(gender)
+        scores[genders == gender] += np.where(gender_ok, GENDER_MATCH_BONUS, 0.0)
+
+    scores += _overlap_counts(index.tags.professions, list(profiles["professions"]), n) * PROFESSION_MATCH_WEIGHT
+    scores += _overlap_counts(index.tags.hobbies, list(profiles["hobbies"]), n) * HOBBY_MATCH_WEIGHT
+
+    texts = [(text or "").strip().lower() for text in profiles["social_interests"]]
+    matches_by_text: Dict[str, SocialMatches] = {}
+    for row, text in enumerate(texts):
+        if text:
+            if text not in matches_by_text:
+                matches_by_text[text] = match_social(index.tags, text)
+            social = matches_by_text[text]
+            # Gifts without a mentioned tag would only get + 0.0
+            scores[row, social.positions] += social.counts * SOCIAL_TAG_WEIGHT
+
+    window = _unpack_age_rows(index.ages.window_bits, index.ages.first_age, ages, n)
+    window[~window.any(axis=1)] = True
+    scores[~window] = -np.inf
+    return scores
+
+
+def iter_batch_recommendations(
+    df: pd.DataFrame,
+    profiles: pd.DataFrame,
+    top_k: int = 10,
+    index: Optional[GiftIndex] = None,
+    chunk_cells: int = DEFAULT_CHUNK_CELLS,
+) -> Iterator[pd.DataFrame]:
+    # Yields one long-format result frame (profile_id, rank, gift_id, name,
+    # match_score) per chunk of profiles
+    if index is None:
+        index = build_gift_index(df)
+    arrays = catalog_arrays(df)
+    trend = arrays.trend
+    names = name_order(df)
+    ids = df.index.to_numpy()
+    step = max(1, chunk_cells // max(len(df), 1))
+    profile_ids = profiles["profile_id"] if "profile_id" in profiles else pd.Series(profiles.index)
+
+    for start in range(0, len(profiles), step):
+        chunk = profiles.iloc[start : start + step]
+        scores = score_profiles(df, index, chunk, arrays)
+        rows, winners = [], []
+        for row, profile_id in enumerate(profile_ids.iloc[start : start + step]):
+            in_window = np.flatnonzero(np.isfinite(scores[row]))
+            top = in_window[
+                select_top_k(scores[row, in_window], trend[in_window], names[in_window], ids[in_window], top_k)
+            ]
+            for rank, pos in enumerate(top, start=1):
+                rows.append((profile_id, rank, int(ids[pos]), float(scores[row, pos])))
+            winners.extend(top)
+        # Names decoded for the winners only
+        result = pd.DataFrame(rows, columns=["profile_id", "rank", "gift_id", "match_score"])
+        result.insert(3, "name", catalog_column(df.iloc[winners], "name").to_numpy())
+        yield result
+
+
+def recommend_batch(
+    df: pd.DataFrame,
+    profiles: pd.DataFrame,
+    top_k: int = 10,
+    index: Optional[GiftIndex] = None,
+    chunk_cells: int = DEFAULT_CHUNK_CELLS,
+) -> pd.DataFrame:
+    parts = list(iter_batch_recommendations(df, profiles, top_k, index, chunk_cells))
+    if not parts:
+        return pd.DataFrame(columns=["profile_id", "rank", "gift_id", "name", "match_score"])
+    return pd.concat(parts, ignore_index=True)
+
+
+# -----------------------------
+# Profile Files
+# -----------------------------
+class ProfileError(ValueError):
+    # A profile record (file row or request body) that can't be scored
+    pass
+
+
+def normalize_profile(record: Dict[str, Any], where: str) -> Dict[str, Any]:
+    try:
+        age = int(record["age"])
+    except (KeyError, TypeError, ValueError, OverflowError) as exc:
+        raise ProfileError(f"{where}: age must be an integer") from exc
+    try:
+        professions = parse_tag_list(record.get("professions") or [], "professions", where)
+        hobbies = parse_tag_list(record.get("hobbies") or [], "hobbies", where)
+    except CatalogError as exc:
+        raise ProfileError(str(exc)) from exc
+    profile = {
+        "age": age,
+        "gender": str(record.get("gender") or "Other"),
+        "professions": professions,
+        "hobbies": hobbies,
+        "social_interests": str(record.get("social_interests") or ""),
+    }
+    if record.get("profile_id") not in (None, ""):
+        profile["profile_id"] = record["profile_id"]
+    return profile
+
+
+def _checked(records: Iterator[Dict[str, Any]], path: str) -> Iterator[Dict[str, Any]]:
+    # Unreadable rows (bad JSON, broken CSV quoting) as ProfileError
+    i = 0
+    while True:
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        except (ValueError, csv.Error) as exc:
+            raise ProfileError(f"{path}: profile {i + 1}: unreadable ({exc})") from exc
+        i += 1
+        yield record
+
+
+def iter_profile_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as fh:
+        if ext == ".csv":
+            records: Iterator[Dict[str, Any]] = csv.DictReader(fh)
+        elif ext in (".jsonl", ".ndjson"):
+            records = (json.loads(line) for line in fh if line.strip())
+        else:
+            raise ProfileError(f"Unsupported profile format: {path}")
+
+        chunk: List[Dict[str, Any]] = []
+        for i, record in enumerate(_checked(records, path)):
+            if not isinstance(record, dict):
+                raise ProfileError(f"{path}: profile {i + 1}: not an object")
+            profile = normalize_profile(record, f"{path}: profile {i + 1}")
+            profile.setdefault("profile_id", i)
+            chunk.append(profile)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk)
+
+
+class ResultWriter:
+    def __init__(self, path: str) -> None:
+        self._csv = os.path.splitext(path)[1].lower() == ".csv"
+        self._fh = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        self._writer = None
+
+    def write(self, results: pd.DataFrame) -> None:
+        if self._csv:
+            if self._writer is None:
+                self._writer = csv.writer(self._fh)
+                self._writer.writerow(results.columns)
+            self._writer.writerows(results.itertuples(index=False))
+        else:
+            for record in results.to_dict("records"):
+                self._fh.write(json.dumps(record, default=str) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not sys.stdout:
+            self._fh.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a file of gift receiver profiles.")
+    parser.add_argument("profiles", help="CSV or JSONL file with age, gender, professions, hobbies, social_interests")
+    parser.add_argument("-o", "--output", default="-", help="CSV or JSONL results file (default: JSONL on stdout)")
+    parser.add_argument("-k", "--top-k", type=int, default=10)
+    parser.add_argument("--catalog", help="catalog file or compiled catalog directory; defaults to GIFT_CATALOG_PATH or the built-in dataset")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="profiles read per chunk")
+    parser.add_argument("--chunk-cells", type=int, default=DEFAULT_CHUNK_CELLS)
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        os.environ["GIFT_CATALOG_PATH"] = args.catalog
+    try:
+        snapshot = build_snapshot()
+    except (CatalogError, OSError) as exc:
+        raise SystemExit(f"error: {exc}")
+    df, index = snapshot.df, snapshot.index
+
+    writer = ResultWriter(args.output)
+    try:
+        for profiles in iter_profile_chunks(args.profiles, args.chunk_size):
+            for results in iter_batch_recommendations(df, profiles, args.top_k, index, args.chunk_cells):
+                writer.write(results)
+    except (ProfileError, OSError) as exc:
+        # Results of the chunks before the bad row are already written
+        raise SystemExit(f"error: {exc}")
+    finally:
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
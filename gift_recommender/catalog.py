@@ -0,0 +1,31 @@
+import os
+from typing import Optional
+
+import pandas as pd
+
+from .catalog_loader import catalog_version, load_catalog
+from .compact_catalog import categorize_enums
+from .dataset import build_gift_dataset
+from .encoding import add_tag_bitmasks
+
+
+# -----------------------------
+# Catalog Loading
+# -----------------------------
+def catalog_path() -> Optional[str]:
+    return os.environ.get("GIFT_CATALOG_PATH") or None
+
+
+def load_gift_catalog(path: Optional[str] = None) -> pd.DataFrame:
+    # External catalog (JSONL/CSV/Parquet) from path or GIFT_CATALOG_PATH,
+    # otherwise the built-in dataset.
+    path = path or catalog_path()
+    if path:
+        return load_catalog(path)
+    return build_gift_dataset()
+
+
+def build_gift_df(path: Optional[str] = None) -> pd.DataFrame:
+    df = add_tag_bitmasks(categorize_enums(load_gift_catalog(path)))
+    df.attrs["catalog_version"] = catalog_version(df)
+    return df
@@ -0,0 +1,174 @@
+import csv
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+
+
+# -----------------------------
+# Catalog Schema
+# -----------------------------
+INT_FIELDS = ("min_age", "max_age")
+FLOAT_FIELDS = ("social_trend_score",)
+LIST_FIELDS = ("profession_match", "hobby_tags", "social_tags")
+TEXT_FIELDS = ("name", "gender_pref", "price_range", "image_url", "buy_link", "why_base")
+# Accepted min_age/max_age range; also bounds the rows of the age index
+MIN_GIFT_AGE = 0
+MAX_GIFT_AGE = 120
+
+# Column order of the built-in dataset
+CATALOG_COLUMNS = (
+    "name",
+    "min_age",
+    "max_age",
+    "gender_pref",
+    "profession_match",
+    "hobby_tags",
+    "social_tags",
+    "social_trend_score",
+    "price_range",
+    "image_url",
+    "buy_link",
+    "why_base",
+)
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def parse_tag_list(value: Any, field: str, where: str) -> List[str]:
+    # CSV cells hold either a JSON array or a "|"-separated list
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise CatalogError(f"{where}: {field} is not a valid JSON list") from exc
+        else:
+            value = [part.strip() for part in text.split("|") if part.strip()]
+    if not isinstance(value, (list, tuple)) and not hasattr(value, "tolist"):
+        raise CatalogError(f"{where}: {field} must be a list of strings")
+    items = list(value.tolist() if hasattr(value, "tolist") else value)
+    if not all(isinstance(item, str) for item in items):
+        raise CatalogError(f"{where}: {field} must be a list of strings")
+    return items
+
+
+def validate_gift(record: Dict[str, Any], where: str) -> Dict[str, Any]:
+    missing = [field for field in CATALOG_COLUMNS if record.get(field) is None]
+    if missing:
+        raise CatalogError(f"{where}: missing {', '.join(missing)}")
+
+    gift: Dict[str, Any] = {}
+    for field in TEXT_FIELDS:
+        value = record[field]
+        if not isinstance(value, str) or not value.strip():
+            raise CatalogError(f"{where}: {field} must be a non-empty string")
+        gift[field] = value
+    for field in INT_FIELDS:
+        try:
+            gift[field] = int(record[field])
+        except (TypeError, ValueError, OverflowError) as exc:
+            raise CatalogError(f"{where}: {field} must be an integer") from exc
+        if not MIN_GIFT_AGE <= gift[field] <= MAX_GIFT_AGE:
+            raise CatalogError(f"{where}: {field} must be between {MIN_GIFT_AGE} and {MAX_GIFT_AGE}")
+    for field in FLOAT_FIELDS:
+        try:
+            gift[field] = float(record[field])
+        except (TypeError, ValueError) as exc:
+            raise CatalogError(f"{where}: {field} must be a number") from exc
+    for field in LIST_FIELDS:
+        gift[field] = parse_tag_list(record[field], field, where)
+
+    if gift["min_age"] > gift["max_age"]:
+        raise CatalogError(f"{where}: min_age is greater than max_age")
+    return {field: gift[field] for field in CATALOG_COLUMNS}
+
+
+# -----------------------------
+# Chunked Readers
+# -----------------------------
+def _chunked(records: Iterator[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise CatalogError(f"{path}:{lineno}: invalid JSON") from exc
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8", newline="") as fh:
+        yield from csv.DictReader(fh)
+
+
+def _read_parquet(path: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise CatalogError("Reading Parquet catalogs requires pyarrow") from exc
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        yield from batch.to_pylist()
+
+
+def iter_catalog_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    # Validated gift records, chunk_size at a time
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        records = _read_jsonl(path)
+    elif ext == ".csv":
+        records = _read_csv(path)
+    elif ext in (".parquet", ".pq"):
+        records = _read_parquet(path, chunk_size)
+    else:
+        raise CatalogError(f"Unsupported catalog format: {path}")
+
+    offset = 0
+    for chunk in _chunked(records, chunk_size):
+        yield [validate_gift(record, f"{path}: gift {offset + i + 1}") for i, record in enumerate(chunk)]
+        offset += len(chunk)
+
+
+def load_catalog(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    # Each chunk is turned into a small frame as soon as it is read, so only
+    # one chunk of raw records is alive at a time.
+    frames = []
+    for chunk in iter_catalog_chunks(path, chunk_size):
+        frames.append(pd.DataFrame.from_records(chunk, columns=list(CATALOG_COLUMNS)))
+        del chunk
+    if not frames:
+        raise CatalogError(f"{path}: catalog is empty")
+    return pd.concat(frames, ignore_index=True)
+
+
+def catalog_version(df: pd.DataFrame) -> str:
+    # Content hash of the catalog columns; changes whenever any gift does
+    digest = hashlib.sha1()
+    for field in CATALOG_COLUMNS:
+        column = df[field]
+        if field in LIST_FIELDS:
+            column = column.map("|".join)
+        hashed = pd.util.hash_pandas_object(column.astype(str), index=False)
+        digest.update(field.encode())
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()[:16]
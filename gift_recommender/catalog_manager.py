@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from .catalog import build_gift_df, catalog_path
+from .catalog_loader import CatalogError
+from .compact_catalog import compact_frame
+from .compiled_catalog import is_compiled, load_compiled, manifest_path
+from .indexes import GiftIndex, build_gift_index
+
+if TYPE_CHECKING:
+    from .shared_cache import SharedCache
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    # One catalog version with everything derived from it. Readers take a
+    # snapshot once per request and use only that, so a reload never mixes
+    # versions within one request.
+    df: pd.DataFrame
+    index: GiftIndex
+    version: str
+    loaded_at: float
+
+
+def _snapshot(df: pd.DataFrame, index: GiftIndex) -> CatalogSnapshot:
+    usage = df.attrs["compact"].memory_usage()
+    logger.info("catalog %s: %d gifts, %.1f MB compact", df.attrs["catalog_version"], len(df), usage["total"] / 1e6)
+    return CatalogSnapshot(df=df, index=index, version=df.attrs["catalog_version"], loaded_at=time.time())
+
+
+def build_snapshot(path: Optional[str] = None, shared: Optional["SharedCache"] = None) -> CatalogSnapshot:
+    # The snapshot holds a compact frame (see compact_catalog): tag lists and
+    # text are decoded only for the rows a request returns. With a shared
+    # cache, a catalog file another process already built (same path, mtime
+    # and size) is loaded from there instead of being rebuilt. A compiled
+    # catalog directory is memory-mapped and needs neither.
+    path = path or catalog_path()
+    if is_compiled(path):
+        return _snapshot(*load_compiled(path))
+    key = _artifact_key(path) if shared is not None else None
+    if key is not None:
+        cached = shared.get_artifact(key)
+        if cached is not None:
+            df, index = cached
+            logger.info("catalog %s loaded from shared cache", df.attrs["catalog_version"])
+            return _snapshot(df, index)
+    df = build_gift_df(path)
+    index = build_gift_index(df)
+    df = compact_frame(df)
+    if key is not None:
+        # Best-effort: a failed or oversized write only means the next
+        # process builds the catalog itself
+        shared.put_artifact(key, (df, index))
+    return _snapshot(df, index)
+
+
+def _artifact_key(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # The prefix names the artifact layout; bump it when GiftIndex changes
+    return f"catalog-v5:{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class CatalogManager:
+    # Holds the current CatalogSnapshot and replaces it when the catalog file
+    # changes. A background thread polls the file's (mtime, size); on a
+    # change it builds the new frame and indexes off to the side, then swaps
+    # the snapshot reference in one assignment. Requests that already hold
+    # the old snapshot finish on it; it is freed once they drop it. A failed
+    # or unchanged (same catalog_version) rebuild keeps the current snapshot.
+    # The path may also be a compiled catalog directory (compiled_catalog).
+    # The built-in catalog has no file and is never reloaded.
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        shared: Optional["SharedCache"] = None,
+    ) -> None:
+        self.path = path or catalog_path()
+        self.poll_seconds = poll_seconds
+        self.shared = shared
+        self.reloads = 0
+        self.failures = 0
+        self._listeners: List[Callable[[CatalogSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._source_signature()
+        self._snapshot = build_snapshot(self.path, self.shared)
+
+    def current(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def add_listener(self, callback: Callable[[CatalogSnapshot], None]) -> None:
+        # Called with each newly swapped-in snapshot, on the reload thread
+        self._listeners.append(callback)
+
+    def _source_signature(self) -> Optional[Tuple[int, int]]:
+        if not self.path:
+            return None
+        # A compiled catalog is rewritten manifest-last, so its manifest's
+        # stat changes exactly when a new artifact is complete
+        source = manifest_path(self.path) if os.path.isdir(self.path) else self.path
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        # Reload if the source changed since the last check; True on a swap
+        with self._lock:
+            signature = self._source_signature()
+            if signature is None or signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                snapshot = build_snapshot(self.path, self.shared)
+            except (CatalogError, OSError) as exc:
+                self.failures += 1
+                logger.warning("catalog reload failed (%s); keeping version %s", exc, self._snapshot.version)
+                return False
+            except Exception:
+                self.failures += 1
+                logger.exception("catalog reload failed; keeping version %s", self._snapshot.version)
+                return False
+            if snapshot.version == self._snapshot.version:
+                return False
+            previous, self._snapshot = self._snapshot, snapshot
+            self.reloads += 1
+        logger.info("catalog reloaded: %s -> %s (%d gifts)", previous.version, snapshot.version, len(snapshot.df))
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception:
+                logger.exception("catalog reload listener failed")
+        return True
+
+    def start(self) -> "CatalogManager":
+        if self.path and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="catalog-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
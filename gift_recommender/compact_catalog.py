@@ -0,0 +1,232 @@
+import itertools
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .catalog_loader import CATALOG_COLUMNS, FLOAT_FIELDS, INT_FIELDS, LIST_FIELDS
+
+
+# Low-cardinality string columns stored as small-int category codes
+ENUM_FIELDS = ("gender_pref", "price_range")
+# Free text, kept as UTF-8 bytes and decoded per row on demand
+PLAIN_TEXT_FIELDS = ("name", "image_url", "buy_link", "why_base")
+
+
+def _smallest_uint(max_value: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+@dataclass(frozen=True)
+class TagColumn:
+    # CSR layout: gift i has tags vocab[codes[offsets[i]:offsets[i + 1]]]
+    vocab: Tuple[str, ...]
+    offsets: np.ndarray
+    codes: np.ndarray
+
+    def tags(self, i: int) -> List[str]:
+        return [self.vocab[c] for c in self.codes[self.offsets[i] : self.offsets[i + 1]]]
+
+    def to_lists(self, positions: Optional[np.ndarray] = None) -> List[List[str]]:
+        if positions is None:
+            positions = range(len(self.offsets) - 1)
+        return [self.tags(i) for i in positions]
+
+    def nbytes(self) -> int:
+        vocab_bytes = sum(sys.getsizeof(tag) for tag in self.vocab)
+        return self.offsets.nbytes + self.codes.nbytes + vocab_bytes
+
+
+@dataclass(frozen=True)
+class TextColumn:
+    # Gift i's text is the UTF-8 bytes utf8[offsets[i]:offsets[i + 1]]
+    offsets: np.ndarray
+    utf8: np.ndarray
+
+    def text(self, i: int) -> str:
+        return self.utf8[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def to_array(self, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        if positions is None:
+            positions = range(len(self.offsets) - 1)
+        values = np.empty(len(positions), dtype=object)
+        values[:] = [self.text(i) for i in positions]
+        return values
+
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.utf8.nbytes
+
+
+def encode_text_column(values) -> TextColumn:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return TextColumn(offsets=offsets, utf8=np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def encode_tag_column(tag_lists) -> TagColumn:
+    # Codes number tags in order of first appearance
+    lengths = np.fromiter((len(tags) for tags in tag_lists), dtype=np.int64, count=len(tag_lists))
+    flat, vocab = pd.factorize(pd.Series(list(itertools.chain.from_iterable(tag_lists)), dtype=object))
+    offsets = np.zeros(len(tag_lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    codes = flat.astype(_smallest_uint(max(len(vocab) - 1, 0)))
+    return TagColumn(vocab=tuple(sys.intern(tag) for tag in vocab), offsets=offsets, codes=codes)
+
+
+def categorize_enums(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for field in ENUM_FIELDS:
+        if field in df and not isinstance(df[field].dtype, pd.CategoricalDtype):
+            df[field] = df[field].astype("category")
+    return df
+
+
+def name_ranks(names: np.ndarray) -> np.ndarray:
+    # Rank of each gift by (name, position); orders gifts exactly as
+    # comparing names, then catalog ids, does
+    n = len(names)
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[np.lexsort((np.arange(n), np.asarray(names).astype(str)))] = np.arange(n)
+    return ranks
+
+
+@dataclass(frozen=True)
+class CompactCatalog:
+    # The catalog columns without per-gift Python objects: numeric arrays,
+    # category-coded enums, CSR tag lists and UTF-8 text. Frames built by
+    # compact_frame keep one of these in attrs in place of their tag-list
+    # and text columns, and decode_rows() decodes just the rows returned.
+    size: int
+    numeric: Dict[str, np.ndarray]
+    enums: Dict[str, pd.Categorical]
+    tags: Dict[str, TagColumn]
+    text: Dict[str, TextColumn]
+    name_rank: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CompactCatalog":
+        numeric = {field: df[field].to_numpy(dtype=np.int16) for field in INT_FIELDS}
+        numeric.update({field: df[field].to_numpy(dtype=np.float64) for field in FLOAT_FIELDS})
+        return cls(
+            size=len(df),
+            numeric=numeric,
+            enums={field: pd.Categorical(df[field]) for field in ENUM_FIELDS},
+            tags={field: encode_tag_column(df[field]) for field in LIST_FIELDS},
+            text={field: encode_text_column(df[field]) for field in PLAIN_TEXT_FIELDS},
+            name_rank=name_ranks(df["name"].to_numpy()),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = {}
+        for field in CATALOG_COLUMNS:
+            if field in self.numeric:
+                dtype = np.int64 if field in INT_FIELDS else np.float64
+                columns[field] = self.numeric[field].astype(dtype)
+            elif field in self.enums:
+                columns[field] = self.enums[field]
+            elif field in self.tags:
+                columns[field] = self.tags[field].to_lists()
+            else:
+                columns[field] = self.text[field].to_array()
+        return pd.DataFrame(columns)
+
+    def memory_usage(self) -> Dict[str, int]:
+        # Bytes per field, plus "total"
+        usage = {field: values.nbytes for field, values in self.numeric.items()}
+        for field, values in self.enums.items():
+            usage[field] = values.codes.nbytes + sum(sys.getsizeof(c) for c in values.categories)
+        for field, column in self.tags.items():
+            usage[field] = column.nbytes()
+        for field, column in self.text.items():
+            usage[field] = column.nbytes()
+        usage["name_rank"] = self.name_rank.nbytes
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "CompactCatalog":
+        # Immutable; pandas deep-copies attrs into every derived frame
+        return self
+
+
+def frame_memory_usage(df: pd.DataFrame) -> Dict[str, int]:
+    # Same report for a plain catalog frame, list columns included
+    usage = {}
+    for field in CATALOG_COLUMNS:
+        column = df[field]
+        if field in LIST_FIELDS:
+            usage[field] = column.memory_usage(index=False) + sum(
+                sys.getsizeof(tags) + sum(sys.getsizeof(t) for t in tags) for tags in column
+            )
+        else:
+            usage[field] = int(column.memory_usage(index=False, deep=True))
+    usage["total"] = sum(usage.values())
+    return usage
+
+
+# -----------------------------
+# Compact Frames
+# -----------------------------
+def catalog_frame(catalog: CompactCatalog, extra: Dict[str, np.ndarray], attrs: Dict[str, Any]) -> pd.DataFrame:
+    # Scoring frame over a CompactCatalog: numeric and enum columns, name_rank
+    # and the extra (bitmask) columns; no per-gift Python objects
+    columns: Dict[str, Any] = {}
+    for field in CATALOG_COLUMNS:
+        if field in catalog.numeric:
+            columns[field] = catalog.numeric[field]
+        elif field in catalog.enums:
+            columns[field] = catalog.enums[field]
+    columns["name_rank"] = catalog.name_rank
+    columns.update(extra)
+    # copy=False keeps memory-mapped arrays as views
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs.update(attrs)
+    df.attrs["compact"] = catalog
+    return df
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # df with its tag-list and text columns held compactly instead
+    extra = {column: df[column].to_numpy() for column in df.columns if column not in CATALOG_COLUMNS}
+    return catalog_frame(CompactCatalog.from_frame(df), extra, df.attrs)
+
+
+def catalog_column(df: pd.DataFrame, field: str) -> pd.Series:
+    # A catalog column for df's rows, decoded if df is a compact frame
+    if field in df:
+        return df[field]
+    catalog: CompactCatalog = df.attrs["compact"]
+    positions = df.index.to_numpy()
+    if field in catalog.tags:
+        values = np.empty(len(positions), dtype=object)
+        values[:] = catalog.tags[field].to_lists(positions)
+    else:
+        values = catalog.text[field].to_array(positions)
+    return pd.Series(values, index=df.index, name=field)
+
+
+def decode_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    # Result rows with every catalog column; a no-op for plain frames
+    if "compact" not in rows.attrs:
+        return rows
+    missing = [field for field in CATALOG_COLUMNS if field not in rows]
+    if not missing:
+        return rows
+    decoded = pd.DataFrame({field: catalog_column(rows, field) for field in missing}, index=rows.index)
+    order = list(CATALOG_COLUMNS) + [column for column in rows.columns if column not in CATALOG_COLUMNS]
+    out = pd.concat([rows, decoded], axis=1)[order]
+    out.attrs.update(rows.attrs)
+    return out
+
+
+def name_order(df: pd.DataFrame) -> np.ndarray:
+    # What select_top_k breaks score and trend ties on: the names, or for a
+    # compact frame their precomputed ranks, which order the same
+    if "name_rank" in df:
+        return df["name_rank"].to_numpy()
+    return df["name"].to_numpy()
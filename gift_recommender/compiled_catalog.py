@@ -0,0 +1,214 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .catalog import build_gift_df, catalog_path
+from .catalog_loader import (
+    CATALOG_COLUMNS,
+    FLOAT_FIELDS,
+    INT_FIELDS,
+    LIST_FIELDS,
+    CatalogError,
+    validate_gift,
+)
+from .compact_catalog import ENUM_FIELDS, PLAIN_TEXT_FIELDS, CompactCatalog, TagColumn, TextColumn, catalog_frame
+from .encoding import BITMASK_COLUMNS, bit_columns
+from .indexes import AgeIndex, GiftIndex, TagIndex, build_gift_index, build_social_matcher
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes; older artifacts are rejected
+FORMAT_VERSION = 5
+MANIFEST_NAME = "manifest.json"
+
+
+def is_compiled(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def manifest_path(path: str) -> str:
+    return os.path.join(path, MANIFEST_NAME)
+
+
+# -----------------------------
+# Compile
+# -----------------------------
+def _postings_arrays(postings: Dict[str, np.ndarray]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    keys = sorted(postings)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum([len(postings[k]) for k in keys], out=offsets[1:])
+    flat = np.concatenate([postings[k] for k in keys]) if keys else np.empty(0, dtype=np.int64)
+    return keys, offsets, flat.astype(np.int64)
+
+
+def compile_catalog(out_dir: str, path: Optional[str] = None) -> Dict[str, Any]:
+    # Validate the catalog, then write every array the scorer needs as .npy
+    # files plus a manifest, into a fresh directory swapped in at the end so
+    # a running CatalogManager never sees a half-written artifact.
+    start = time.perf_counter()
+    path = path or catalog_path()
+    df = build_gift_df(path)
+    if not path:
+        # External files are validated while loading; the built-in list is not
+        for i, record in enumerate(df[list(CATALOG_COLUMNS)].to_dict("records")):
+            validate_gift(record, f"built-in catalog: gift {i + 1}")
+    index = build_gift_index(df)
+
+    tmp_dir = f"{out_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    def save(name: str, array: np.ndarray) -> None:
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+
+    manifest: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "catalog_version": df.attrs["catalog_version"],
+        "size": len(df),
+        "enums": {},
+        "tags": {},
+        "tag_vocab": df.attrs["tag_vocab"],
+    }
+    # The CompactCatalog's arrays, written as they are held
+    catalog = CompactCatalog.from_frame(df)
+    for field, values in catalog.numeric.items():
+        save(field, values)
+    for field, values in catalog.enums.items():
+        save(field, values.codes)
+        manifest["enums"][field] = list(values.categories)
+    for field, column in catalog.tags.items():
+        save(f"{field}.offsets", column.offsets)
+        save(f"{field}.codes", column.codes)
+        manifest["tags"][field] = list(column.vocab)
+    for field, text in catalog.text.items():
+        save(f"{field}.offsets", text.offsets)
+        save(f"{field}.utf8", text.utf8)
+    save("name_rank", catalog.name_rank)
+    for column in BITMASK_COLUMNS:
+        save(f"{column}.bits", df[bit_columns(df, column)].to_numpy(dtype=np.uint64))
+
+    for name in ("professions", "hobbies", "social"):
+        keys, offsets, flat = _postings_arrays(getattr(index.tags, name))
+        save(f"tags.{name}.offsets", offsets)
+        save(f"tags.{name}.positions", flat)
+        manifest[f"tags.{name}"] = keys
+    save("tags.trend_order", index.tags.trend_order)
+    save("ages.fit_bits", index.ages.fit_bits)
+    save("ages.window_bits", index.ages.window_bits)
+    manifest["ages.first_age"] = index.ages.first_age
+
+    manifest["compile_seconds"] = round(time.perf_counter() - start, 3)
+    # Manifest last: its presence marks a complete artifact
+    with open(manifest_path(tmp_dir), "w") as fh:
+        json.dump(manifest, fh)
+    old_dir = f"{out_dir.rstrip(os.sep)}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return {key: manifest[key] for key in ("format_version", "catalog_version", "size", "compile_seconds")}
+
+
+# -----------------------------
+# Load
+# -----------------------------
+def load_compiled(path: str) -> Tuple[pd.DataFrame, GiftIndex]:
+    # Every array is memory-mapped and used in place, CSR tag lists and UTF-8
+    # text included: nothing is decoded per gift at load. The frame is a
+    # compact frame (see compact_catalog); result rows are decoded on return.
+    start = time.perf_counter()
+    try:
+        with open(manifest_path(path)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError) as exc:
+        raise CatalogError(f"{path}: not a compiled catalog") from exc
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise CatalogError(
+            f"{path}: compiled catalog format {manifest.get('format_version')}, expected {FORMAT_VERSION}; recompile it"
+        )
+
+    def load(name: str) -> np.ndarray:
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    size = manifest["size"]
+    catalog = CompactCatalog(
+        size=size,
+        numeric={field: load(field) for field in INT_FIELDS + FLOAT_FIELDS},
+        enums={
+            field: pd.Categorical.from_codes(load(field), categories=manifest["enums"][field]) for field in ENUM_FIELDS
+        },
+        tags={
+            field: TagColumn(
+                vocab=tuple(manifest["tags"][field]), offsets=load(f"{field}.offsets"), codes=load(f"{field}.codes")
+            )
+            for field in LIST_FIELDS
+        },
+        text={
+            field: TextColumn(offsets=load(f"{field}.offsets"), utf8=load(f"{field}.utf8")) for field in PLAIN_TEXT_FIELDS
+        },
+        name_rank=load("name_rank"),
+    )
+    bits: Dict[str, np.ndarray] = {}
+    for column in BITMASK_COLUMNS:
+        matrix = load(f"{column}.bits")
+        for i in range(matrix.shape[1]):
+            bits[f"{column}_bits_{i}"] = matrix[:, i]
+    df = catalog_frame(
+        catalog, bits, {"tag_vocab": manifest["tag_vocab"], "catalog_version": manifest["catalog_version"]}
+    )
+
+    def postings(name: str) -> Dict[str, np.ndarray]:
+        offsets, flat = load(f"tags.{name}.offsets"), load(f"tags.{name}.positions")
+        return {key: flat[offsets[i] : offsets[i + 1]] for i, key in enumerate(manifest[f"tags.{name}"])}
+
+    index = GiftIndex(
+        tags=TagIndex(
+            professions=postings("professions"),
+            hobbies=postings("hobbies"),
+            social=postings("social"),
+            trend_order=load("tags.trend_order"),
+            # Rebuilt from the tag keys; cheap next to the catalog size
+            social_matcher=build_social_matcher(manifest["tags.social"]),
+        ),
+        ages=AgeIndex(
+            first_age=manifest["ages.first_age"],
+            size=size,
+            fit_bits=load("ages.fit_bits"),
+            window_bits=load("ages.window_bits"),
+        ),
+    )
+    logger.info(
+        "compiled catalog %s (%d gifts) loaded in %.1f ms",
+        manifest["catalog_version"],
+        size,
+        (time.perf_counter() - start) * 1000.0,
+    )
+    return df, index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile a gift catalog into a memory-mappable artifact.")
+    parser.add_argument("-o", "--output", required=True, help="artifact directory")
+    parser.add_argument("--catalog", help="catalog file (defaults to GIFT_CATALOG_PATH or the built-in catalog)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = compile_catalog(args.output, args.catalog)
+    except CatalogError as exc:
+        raise SystemExit(f"error: {exc}")
+    start = time.perf_counter()
+    load_compiled(args.output)
+    summary["load_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Tag Bitmask Encoding
+# -----------------------------
+# Multi-valued columns that get a packed multi-hot encoding at load time.
+BITMASK_COLUMNS = ("profession_match", "hobby_tags")
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def bit_columns(df: pd.DataFrame, column: str) -> List[str]:
+    return [c for c in df.columns if c.startswith(f"{column}_bits_")]
+
+
+def encode_tag_bits(tags: List[str], vocab: Dict[str, int]) -> np.ndarray:
+    # One uint64 word per 64 vocabulary entries; unknown tags set no bit.
+    words = np.zeros(max(1, -(-len(vocab) // 64)), dtype=np.uint64)
+    for tag in tags:
+        pos = vocab.get(tag)
+        if pos is not None:
+            words[pos // 64] |= np.uint64(1) << np.uint64(pos % 64)
+    return words
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    # Set bits per row of a (rows, words) uint64 matrix
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    per_byte = _BYTE_POPCOUNT[words.view(np.uint8)]
+    return per_byte.reshape(words.shape[0], -1 if words.size else 0).sum(axis=1, dtype=np.int64)
+
+
+def add_tag_bitmasks(df: pd.DataFrame) -> pd.DataFrame:
+    # Encode each list column as <column>_bits_<i> uint64 columns and keep the
+    # tag -> bit position vocabulary in df.attrs for encoding queries.
+    df = df.copy()
+    vocabs: Dict[str, Dict[str, int]] = {}
+    for column in BITMASK_COLUMNS:
+        df = df.drop(columns=bit_columns(df, column))
+        tags = sorted({tag for tag_list in df[column] for tag in tag_list})
+        vocab = {tag: pos for pos, tag in enumerate(tags)}
+        encoded = [encode_tag_bits(tag_list, vocab) for tag_list in df[column]]
+        matrix = np.vstack(encoded) if encoded else np.zeros((0, 1), dtype=np.uint64)
+        for i in range(matrix.shape[1]):
+            df[f"{column}_bits_{i}"] = matrix[:, i]
+        vocabs[column] = vocab
+    df.attrs["tag_vocab"] = vocabs
+    return df
+
+
+def count_tag_overlap(df: pd.DataFrame, column: str, wanted: List[str]) -> np.ndarray:
+    # len(set(wanted) & set(gift[column])) for every row, as AND + popcount
+    if "tag_vocab" not in df.attrs or not bit_columns(df, column):
+        df = add_tag_bitmasks(df)
+    query = encode_tag_bits(wanted, df.attrs["tag_vocab"][column])
+    gift_bits = df[bit_columns(df, column)].to_numpy(dtype=np.uint64)
+    return popcount(gift_bits & query)
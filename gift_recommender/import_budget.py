@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+
+# Wall-clock budget (ms) for importing each module in a fresh interpreter.
+# The package itself must not pull in numpy/pandas; the scoring core may.
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "gift_recommender": 50.0,
+    "gift_recommender.result_cache": 50.0,
+    "gift_recommender.scoring": 1500.0,
+    "gift_recommender.batch": 1500.0,
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000.0
+print(elapsed, int("streamlit" in sys.modules), int("pandas" in sys.modules))
+"""
+
+
+def measure_import(module: str, repeats: int = 3) -> Dict[str, float]:
+    # Best-of-N import time in a fresh interpreter, plus which heavy modules
+    # ended up loaded
+    best = float("inf")
+    streamlit = pandas = False
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        best = min(best, float(out[0]))
+        streamlit, pandas = out[1] == "1", out[2] == "1"
+    return {"ms": round(best, 2), "streamlit": streamlit, "pandas": pandas}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check import times against the budget.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        result = measure_import(module, args.repeats)
+        result.update(module=module, budget_ms=budget)
+        over = result["ms"] > budget or result["streamlit"]
+        if module in ("gift_recommender", "gift_recommender.result_cache") and result["pandas"]:
+            over = True
+        result["ok"] = not over
+        failed = failed or over
+        print(json.dumps(result))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
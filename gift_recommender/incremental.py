@@ -0,0 +1,138 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compact_catalog import decode_rows, name_order
+from .encoding import count_tag_overlap
+from .indexes import (
+    AGE_FIT_BONUS,
+    AGE_MISS_PENALTY,
+    GENDER_MATCH_BONUS,
+    HOBBY_MATCH_WEIGHT,
+    PROFESSION_MATCH_WEIGHT,
+    GiftIndex,
+    age_window_mask,
+    match_social,
+    social_bonus,
+)
+from .scoring import select_top_k
+from .timing import current_timer
+
+
+# Score terms in the order compute_match_scores adds them; summing the cached
+# vectors in this order reproduces its floats exactly.
+COMPONENTS = ("trend", "age", "gender", "professions", "hobbies", "social")
+
+
+class IncrementalScorer:
+    # Keeps each score term as a whole-catalog vector together with the input
+    # it was computed from, so a rerun only recomputes the terms whose
+    # sidebar input changed (an age drag leaves the social term untouched).
+    # One instance per session; bound to one catalog version.
+
+    def __init__(self, df: pd.DataFrame, index: GiftIndex) -> None:
+        self.df = df
+        self.index = index
+        self.catalog_version = df.attrs.get("catalog_version")
+        self._components: Dict[str, Tuple[Any, np.ndarray]] = {}
+        self._window: Tuple[Any, np.ndarray] = (None, np.empty(0, dtype=bool))
+        self._trend = df["social_trend_score"].to_numpy(dtype=np.float64)
+        self._names = name_order(df)
+        self._ids = df.index.to_numpy()
+        self.recomputed: Dict[str, int] = {name: 0 for name in COMPONENTS}
+
+    # -----------------------------
+    # Score terms
+    # -----------------------------
+    def _age(self, age: int) -> np.ndarray:
+        ages = self.index.ages
+        row = age - ages.first_age
+        if 0 <= row < len(ages.fit_bits):
+            fits = np.unpackbits(ages.fit_bits[row], count=ages.size).astype(bool)
+        else:
+            fits = np.zeros(ages.size, dtype=bool)
+        return np.where(fits, AGE_FIT_BONUS, AGE_MISS_PENALTY)
+
+    def _gender(self, gender: str) -> np.ndarray:
+        gender_pref = self.df["gender_pref"]
+        gender_ok = (gender_pref == "Any") | (gender_pref.str.lower() == gender)
+        return np.where(gender_ok.to_numpy(), GENDER_MATCH_BONUS, 0.0)
+
+    def _overlap(self, column: str, weight: float, tags: Tuple[str, ...]) -> np.ndarray:
+        if not tags:
+            return np.zeros(len(self.df))
+        return count_tag_overlap(self.df, column, list(tags)) * weight
+
+    def _social(self, text: str) -> np.ndarray:
+        if not text:
+            return np.zeros(len(self.df))
+        return social_bonus(match_social(self.index.tags, text), np.arange(len(self.df)))
+
+    def _component(self, name: str, key: Any, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        cached = self._components.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        timer = current_timer()
+        with timer.stage(f"component:{name}"):
+            vector = compute()
+        timer.count("components_recomputed", 1)
+        self.recomputed[name] += 1
+        self._components[name] = (key, vector)
+        return vector
+
+    def scores(
+        self,
+        age: int,
+        gender: str,
+        professions: List[str],
+        hobbies: List[str],
+        social_interests: str,
+    ) -> np.ndarray:
+        gender = gender.lower()
+        profs = tuple(sorted(set(professions)))
+        hobs = tuple(sorted(set(hobbies)))
+        text = (social_interests or "").strip().lower()
+
+        score = self._component("trend", None, lambda: self._trend).copy()
+        score += self._component("age", age, lambda: self._age(age))
+        score += self._component("gender", gender, lambda: self._gender(gender))
+        score += self._component("professions", profs, lambda: self._overlap("profession_match", PROFESSION_MATCH_WEIGHT, profs))
+        score += self._component("hobbies", hobs, lambda: self._overlap("hobby_tags", HOBBY_MATCH_WEIGHT, hobs))
+        score += self._component("social", text, lambda: self._social(text))
+        return score
+
+    def _age_window(self, age: int) -> np.ndarray:
+        if self._window[0] != age:
+            in_window = age_window_mask(self.index.ages, age)
+            if not in_window.any():
+                in_window = np.ones(len(self.df), dtype=bool)
+            self._window = (age, in_window)
+        return self._window[1]
+
+    def recommend(
+        self,
+        age: int,
+        gender: str,
+        professions: List[str],
+        hobbies: List[str],
+        social_interests: str,
+        top_k: int = 10,
+    ) -> pd.DataFrame:
+        # Same rows, order and match_score as recommend_gifts
+        timer = current_timer()
+        score = self.scores(age, gender, professions, hobbies, social_interests)
+        with timer.stage("top_k"):
+            candidates = np.flatnonzero(self._age_window(age))
+            top = candidates[
+                select_top_k(
+                    score[candidates],
+                    self._trend[candidates],
+                    self._names[candidates],
+                    self._ids[candidates],
+                    top_k,
+                )
+            ]
+            recs = self.df.iloc[top].copy()
+            recs["match_score"] = score[top]
+        return decode_rows(recs)
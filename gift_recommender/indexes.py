@@ -0,0 +1,255 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .tag_matcher import TagMatcher
+
+
+# -----------------------------
+# Catalog Indexes
+# -----------------------------
+# Indexes address gifts by row position in the catalog frame, which is also
+# its index label (build_gift_df returns a RangeIndex frame), so subsets taken
+# with .iloc/boolean masks keep their positions in df.index.
+AGE_WINDOW_SLACK = 8
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9']+")
+
+
+def tokenize_social(text: str) -> List[str]:
+    return [tok for tok in _TOKEN_SPLIT.split((text or "").lower()) if tok]
+
+
+# Free-text phrasings of catalog social tags. Matched on whole words, so
+# "book tok" and "booktok" both mean the booktok tag.
+SOCIAL_SYNONYMS: Dict[str, str] = {
+    "book tok": "booktok",
+    "bookstagram": "booktok",
+    "gym reels": "fitness-reels",
+    "workout reels": "fitness-reels",
+    "fit tok": "fitness-reels",
+    "fittok": "fitness-reels",
+    "gymtok": "fitness-reels",
+    "food reels": "cooking-reels",
+    "recipe reels": "cooking-reels",
+    "foodtok": "cooking-reels",
+    "art tok": "art-tiktok",
+    "arttok": "art-tiktok",
+    "study gram": "studygram",
+    "gadgets": "tech-gadgets",
+    "work from home": "home-office",
+    "wfh": "home-office",
+    "plant mom": "plant-parent",
+    "plant dad": "plant-parent",
+}
+
+
+def build_social_matcher(tags: Iterable[str]) -> TagMatcher:
+    # Every catalog social tag, plus the synonyms of those tags
+    tags = set(tags)
+    phrases = [(tuple(tokenize_social(tag)), tag) for tag in tags]
+    phrases += [(tuple(tokenize_social(phrase)), tag) for phrase, tag in SOCIAL_SYNONYMS.items() if tag in tags]
+    return TagMatcher(phrases)
+
+
+@lru_cache(maxsize=None)
+def _social_phrases(tag: str) -> Tuple[Tuple[str, ...], ...]:
+    phrases = [tuple(tokenize_social(tag))]
+    phrases += [tuple(tokenize_social(phrase)) for phrase, target in SOCIAL_SYNONYMS.items() if target == tag]
+    return tuple(phrase for phrase in phrases if phrase)
+
+
+def mentions_social_tag(words: Sequence[str], tag: str) -> bool:
+    # Whether the tag, or one of its synonyms, occurs in words as whole
+    # words. What the matcher reports, one tag at a time, without it.
+    for phrase in _social_phrases(tag):
+        n = len(phrase)
+        if any(tuple(words[i : i + n]) == phrase for i in range(len(words) - n + 1)):
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class TagIndex:
+    # tag -> sorted row positions into the catalog frame, per column
+    professions: Dict[str, np.ndarray]
+    hobbies: Dict[str, np.ndarray]
+    social: Dict[str, np.ndarray]
+    # all row positions, highest social_trend_score first
+    trend_order: np.ndarray
+    # Aho-Corasick automaton over the social tags (and their synonyms)
+    social_matcher: TagMatcher
+
+
+def _postings(pairs: List[tuple]) -> Dict[str, np.ndarray]:
+    grouped: Dict[str, List[int]] = {}
+    for key, pos in pairs:
+        grouped.setdefault(key, []).append(pos)
+    return {key: np.unique(np.asarray(rows, dtype=np.int64)) for key, rows in grouped.items()}
+
+
+def build_tag_index(df: pd.DataFrame) -> TagIndex:
+    professions, hobbies, social = [], [], []
+    for pos, (prof_tags, hobby_tags, social_tags) in enumerate(
+        zip(df["profession_match"], df["hobby_tags"], df["social_tags"])
+    ):
+        professions.extend((tag, pos) for tag in prof_tags)
+        hobbies.extend((tag, pos) for tag in hobby_tags)
+        social.extend((tag, pos) for tag in social_tags)
+    trend = df["social_trend_score"].to_numpy(dtype=np.float64)
+    social_postings = _postings(social)
+    return TagIndex(
+        professions=_postings(professions),
+        hobbies=_postings(hobbies),
+        social=social_postings,
+        trend_order=np.argsort(-trend, kind="stable"),
+        social_matcher=build_social_matcher(social_postings),
+    )
+
+
+def match_social_tags(index: TagIndex, text: str) -> List[str]:
+    # Catalog social tags mentioned in text: one pass of the automaton over
+    # its words, however many tags and gifts the catalog has
+    return index.social_matcher.tags(tokenize_social(text))
+
+
+def lookup_candidates(
+    index: TagIndex,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+) -> np.ndarray:
+    lists = [index.professions[p] for p in professions if p in index.professions]
+    lists += [index.hobbies[h] for h in hobbies if h in index.hobbies]
+    lists += [index.social[t] for t in match_social_tags(index, social_interests)]
+    # Union as a mask over the catalog; cheaper than np.unique on large lists
+    hit = np.zeros(len(index.trend_order), dtype=bool)
+    for rows in lists:
+        hit[rows] = True
+    return np.flatnonzero(hit)
+
+
+# Match score weights, shared by every scoring path. A gift scores its
+# social_trend_score, plus the age term (in range or not), the gender term,
+# a weight per matching profession and hobby tag, and the social bonus.
+AGE_FIT_BONUS = 3.0
+AGE_MISS_PENALTY = -2.0
+GENDER_MATCH_BONUS = 1.5
+PROFESSION_MATCH_WEIGHT = 1.8
+HOBBY_MATCH_WEIGHT = 2.2
+
+# Each catalog social tag a gift carries that the social-interest text
+# mentions (itself or through a synonym, on whole words) adds this weight.
+SOCIAL_TAG_WEIGHT = 2.5
+
+
+@dataclass(frozen=True)
+class SocialMatches:
+    # Gifts with at least one social tag mentioned in a text: sorted catalog
+    # positions, and how many of their tags were mentioned
+    positions: np.ndarray
+    counts: np.ndarray
+
+
+def match_social(index: TagIndex, text: str) -> SocialMatches:
+    # Touches only the postings of the matched tags
+    lists = [index.social[tag] for tag in match_social_tags(index, text)]
+    if not lists:
+        return SocialMatches(positions=np.empty(0, dtype=np.int64), counts=np.empty(0, dtype=np.int64))
+    positions, counts = np.unique(np.concatenate(lists), return_counts=True)
+    return SocialMatches(positions=positions, counts=counts)
+
+
+def social_bonus(matches: SocialMatches, positions: np.ndarray) -> np.ndarray:
+    # Social term for the given catalog positions; 0.0 for gifts without a
+    # mentioned tag
+    at = np.searchsorted(matches.positions, positions)
+    hit = at < len(matches.positions)
+    hit[hit] = matches.positions[at[hit]] == positions[hit]
+    counts = np.zeros(len(positions), dtype=np.int64)
+    counts[hit] = matches.counts[at[hit]]
+    return counts * SOCIAL_TAG_WEIGHT
+
+
+@dataclass(frozen=True)
+class AgeIndex:
+    # Per-age packed bitsets over catalog positions, one row per age starting
+    # at first_age: exact fit (min_age <= age <= max_age) and the relaxed
+    # pre-filter window (+/- AGE_WINDOW_SLACK years).
+    first_age: int
+    size: int
+    fit_bits: np.ndarray
+    window_bits: np.ndarray
+
+
+def build_age_index(df: pd.DataFrame) -> AgeIndex:
+    min_age = df["min_age"].to_numpy()
+    max_age = df["max_age"].to_numpy()
+    first_age = min(1, int(min_age.min(initial=1)) - AGE_WINDOW_SLACK)
+    last_age = max(100, int(max_age.max(initial=100)) + AGE_WINDOW_SLACK)
+    # One packed row per age, so peak memory is a single unpacked row rather
+    # than an (ages x gifts) boolean matrix
+    n_ages, row_bytes = last_age - first_age + 1, -(-len(df) // 8)
+    fit_bits = np.empty((n_ages, row_bytes), dtype=np.uint8)
+    window_bits = np.empty((n_ages, row_bytes), dtype=np.uint8)
+    for row, age in enumerate(range(first_age, last_age + 1)):
+        fit_bits[row] = np.packbits((min_age <= age) & (age <= max_age))
+        window_bits[row] = np.packbits((min_age - AGE_WINDOW_SLACK <= age) & (age <= max_age + AGE_WINDOW_SLACK))
+    return AgeIndex(first_age=first_age, size=len(df), fit_bits=fit_bits, window_bits=window_bits)
+
+
+def _age_row(index: AgeIndex, bits: np.ndarray, age: int) -> Optional[np.ndarray]:
+    # Ages outside the table are outside every gift's range and window
+    row = age - index.first_age
+    if 0 <= row < len(bits):
+        return bits[row]
+    return None
+
+
+def age_window_mask(index: AgeIndex, age: int) -> np.ndarray:
+    row = _age_row(index, index.window_bits, age)
+    if row is None:
+        return np.zeros(index.size, dtype=bool)
+    return np.unpackbits(row, count=index.size).astype(bool)
+
+
+def age_window_positions(index: AgeIndex, age: int) -> np.ndarray:
+    return np.flatnonzero(age_window_mask(index, age))
+
+
+def age_fit(index: AgeIndex, age: int, positions: np.ndarray) -> np.ndarray:
+    # min_age <= age <= max_age for the given catalog positions
+    row = _age_row(index, index.fit_bits, age)
+    if row is None:
+        return np.zeros(len(positions), dtype=bool)
+    positions = np.asarray(positions, dtype=np.int64)
+    return ((row[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+
+def age_in_window(index: AgeIndex, age: int, positions: np.ndarray) -> np.ndarray:
+    # Relaxed-window membership for the given catalog positions; when no gift
+    # is in the window at all, recommend_gifts scores everything, so every
+    # position counts as inside
+    row = _age_row(index, index.window_bits, age)
+    positions = np.asarray(positions, dtype=np.int64)
+    if row is None or not row.any():
+        return np.ones(len(positions), dtype=bool)
+    return ((row[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+
+@dataclass(frozen=True)
+class GiftIndex:
+    # Derived structures built once per catalog load
+    tags: TagIndex
+    ages: AgeIndex
+
+
+def build_gift_index(df: pd.DataFrame) -> GiftIndex:
+    return GiftIndex(
+        tags=build_tag_index(df),
+        ages=build_age_index(df),
+    )
@@ -0,0 +1,211 @@
+import argparse
+import itertools
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .batch import DEFAULT_CHUNK_CELLS, catalog_arrays, score_profiles
+from .catalog_manager import build_snapshot
+from .compact_catalog import decode_rows, name_order
+from .indexes import GiftIndex, age_in_window, match_social
+from .scoring import compute_match_scores, select_top_k
+from .timing import current_timer
+
+
+# The discrete part of the profile form. With 100 ages, 3 genders and every
+# subset of 5 professions and 6 hobbies this is 614,400 profiles.
+DEFAULT_AGES = (1, 100)
+DEFAULT_GENDERS = ("Male", "Female", "Other")
+DEFAULT_PROFESSIONS = ("Student", "Engineer", "Teacher", "Doctor", "Artist")
+DEFAULT_HOBBIES = ("Gaming", "Reading", "Sports", "Cooking", "Travel", "Music")
+# Covers the app's ranking depth (50); capped at the catalog size
+DEFAULT_TOP_N = 64
+
+META_FILE = "meta.json"
+ARRAY_FILES = ("positions", "counts", "cutoff")
+
+
+def _subsets(options: Sequence[str]) -> List[List[str]]:
+    # Bit i of the subset number selects options[i]
+    return [[o for i, o in enumerate(options) if mask >> i & 1] for mask in range(1 << len(options))]
+
+
+def build_table(
+    df: pd.DataFrame,
+    index: GiftIndex,
+    out_dir: str,
+    top_n: int = DEFAULT_TOP_N,
+    ages: Sequence[int] = DEFAULT_AGES,
+    genders: Sequence[str] = DEFAULT_GENDERS,
+    professions: Sequence[str] = DEFAULT_PROFESSIONS,
+    hobbies: Sequence[str] = DEFAULT_HOBBIES,
+    chunk_cells: int = DEFAULT_CHUNK_CELLS,
+) -> Dict[str, object]:
+    # For every discrete profile, the top_n gifts by score without the social
+    # term (in recommend_gifts order, age window applied) and the score of
+    # the best gift left out. Written as .npy files for np.load(mmap_mode="r").
+    # They are built in a fresh directory that replaces out_dir at the end,
+    # so a running MaterializedTable keeps its mapping of the old files and
+    # never sees truncated or half-written arrays.
+    tmp_dir = f"{out_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    first_age, last_age = ages
+    combos = pd.DataFrame(
+        list(itertools.product(genders, _subsets(professions), _subsets(hobbies))),
+        columns=["gender", "professions", "hobbies"],
+    )
+    combos["social_interests"] = ""
+    n_rows = (last_age - first_age + 1) * len(combos)
+    top_n = min(top_n, len(df))
+
+    positions = np.lib.format.open_memmap(
+        os.path.join(tmp_dir, "positions.npy"),
+        mode="w+",
+        dtype=np.int16 if len(df) < 2**15 else np.int32,
+        shape=(n_rows, top_n),
+    )
+    counts = np.lib.format.open_memmap(os.path.join(tmp_dir, "counts.npy"), mode="w+", dtype=np.int32, shape=(n_rows,))
+    cutoff = np.lib.format.open_memmap(
+        os.path.join(tmp_dir, "cutoff.npy"), mode="w+", dtype=np.float64, shape=(n_rows,)
+    )
+
+    # select_top_k's tie-breaks (trend desc, name, id) as one rank per gift
+    ids = df.index.to_numpy()
+    names = name_order(df)
+    names = names.astype(str) if names.dtype == object else names
+    tie_rank = np.empty(len(df), dtype=np.int64)
+    tie_rank[np.lexsort((ids, names, -df["social_trend_score"].to_numpy()))] = np.arange(len(df))
+    arrays = catalog_arrays(df)
+    step = max(1, chunk_cells // max(len(df), 1))
+    start_time = time.perf_counter()
+    row = 0
+    for age in range(first_age, last_age + 1):
+        combos["age"] = age
+        for start in range(0, len(combos), step):
+            chunk = combos.iloc[start : start + step]
+            scores = score_profiles(df, index, chunk, arrays)
+            order = np.lexsort((np.broadcast_to(tie_rank, scores.shape), -scores), axis=-1)
+            ranked = np.take_along_axis(scores, order, axis=-1)
+            valid = np.isfinite(ranked).sum(axis=1)
+            block = order[:, :top_n].copy()
+            block[np.arange(top_n)[None, :] >= valid[:, None]] = -1
+            end = row + len(chunk)
+            positions[row:end] = block
+            counts[row:end] = np.minimum(valid, top_n)
+            cutoff[row:end] = np.where(valid > top_n, ranked[:, min(top_n, len(df) - 1)], -np.inf)
+            row = end
+
+    for array in (positions, counts, cutoff):
+        array.flush()
+    meta = {
+        "catalog_version": df.attrs.get("catalog_version"),
+        "top_n": top_n,
+        "ages": [first_age, last_age],
+        "genders": list(genders),
+        "professions": list(professions),
+        "hobbies": list(hobbies),
+        "profiles": n_rows,
+        "build_seconds": round(time.perf_counter() - start_time, 3),
+    }
+    with open(os.path.join(tmp_dir, META_FILE), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    old_dir = f"{out_dir.rstrip(os.sep)}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+class MaterializedTable:
+    # Read side of build_table. Arrays are memory-mapped, so opening is cheap
+    # and the OS pages in only the rows that are looked up.
+    #
+    # recommend() answers a profile from its stored candidate list: the
+    # stored gifts, plus any gift in the age window with a social match, are
+    # scored exactly (social term included) and re-ranked. A gift outside
+    # both sets scores at most its social-free score, which is at most the
+    # stored cutoff, so when the k-th best candidate beats the cutoff the
+    # result is exactly recommend_gifts'. Otherwise, or for a profile outside
+    # the table (unknown tag, age out of range, other catalog version), it
+    # returns None and the caller scores normally.
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, META_FILE)) as fh:
+            self.meta = json.load(fh)
+        self.catalog_version = self.meta["catalog_version"]
+        self.top_n = self.meta["top_n"]
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+        self.positions, self.counts, self.cutoff = arrays["positions"], arrays["counts"], arrays["cutoff"]
+        self._genders = {g.lower(): i for i, g in enumerate(self.meta["genders"])}
+        self._professions = {p: i for i, p in enumerate(self.meta["professions"])}
+        self._hobbies = {h: i for i, h in enumerate(self.meta["hobbies"])}
+
+    def row(self, age: int, gender: str, professions: List[str], hobbies: List[str]) -> Optional[int]:
+        first_age, last_age = self.meta["ages"]
+        gender_i = self._genders.get(gender.lower())
+        if not first_age <= age <= last_age or gender_i is None:
+            return None
+        if any(p not in self._professions for p in professions) or any(h not in self._hobbies for h in hobbies):
+            return None
+        p_mask = sum(1 << self._professions[p] for p in set(professions))
+        h_mask = sum(1 << self._hobbies[h] for h in set(hobbies))
+        n_p, n_h = 1 << len(self._professions), 1 << len(self._hobbies)
+        return (((age - first_age) * len(self._genders) + gender_i) * n_p + p_mask) * n_h + h_mask
+
+    def recommend(
+        self,
+        df: pd.DataFrame,
+        index: GiftIndex,
+        age: int,
+        gender: str,
+        professions: List[str],
+        hobbies: List[str],
+        social_interests: str,
+        top_k: int = 10,
+    ) -> Optional[pd.DataFrame]:
+        if df.attrs.get("catalog_version") != self.catalog_version:
+            return None
+        row = self.row(age, gender, professions, hobbies)
+        if row is None:
+            return None
+
+        candidates = np.asarray(self.positions[row, : self.counts[row]], dtype=np.int64)
+        social = None
+        if (social_interests or "").strip():
+            social = match_social(index.tags, social_interests)
+            matched = social.positions[age_in_window(index.ages, age, social.positions)]
+            candidates = np.union1d(candidates, matched)
+
+        rows = df.iloc[candidates].copy()
+        rows["match_score"] = compute_match_scores(
+            rows, age, gender, professions, hobbies, social_interests, index=index, social=social
+        )
+        scores = rows["match_score"].to_numpy()
+        top = select_top_k(scores, rows["social_trend_score"].to_numpy(), name_order(rows), candidates, top_k)
+        exact = np.isneginf(self.cutoff[row]) or (len(top) == top_k and scores[top[-1]] > self.cutoff[row])
+        current_timer().count("table_hits", exact)
+        return decode_rows(rows.iloc[top]) if exact else None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute per-profile candidate lists for the discrete profile space.")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--catalog", help="catalog file or compiled catalog directory (defaults to GIFT_CATALOG_PATH or the built-in catalog)")
+    parser.add_argument("--chunk-cells", type=int, default=DEFAULT_CHUNK_CELLS)
+    args = parser.parse_args(argv)
+
+    snapshot = build_snapshot(args.catalog)
+    meta = build_table(snapshot.df, snapshot.index, args.output, top_n=args.top_n, chunk_cells=args.chunk_cells)
+    print(json.dumps(meta))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compact_catalog import decode_rows, name_order
+from .encoding import bit_columns, encode_tag_bits, popcount
+from .indexes import (
+    AGE_FIT_BONUS,
+    AGE_MISS_PENALTY,
+    AGE_WINDOW_SLACK,
+    GENDER_MATCH_BONUS,
+    HOBBY_MATCH_WEIGHT,
+    PROFESSION_MATCH_WEIGHT,
+    SOCIAL_TAG_WEIGHT,
+    GiftIndex,
+    match_social_tags,
+)
+from .scoring import select_top_k
+
+
+# name -> (shared memory block, shape, dtype)
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_arrays: Dict[str, np.ndarray] = {}
+_blocks: List[SharedMemory] = []
+
+
+def _attach(specs: Dict[str, ArraySpec]) -> None:
+    # Pool initializer: map every catalog array once per worker process
+    for key, (block_name, shape, dtype) in specs.items():
+        # Workers share the parent's resource tracker, and the parent unlinks
+        # the blocks in close()
+        block = SharedMemory(name=block_name)
+        _blocks.append(block)
+        _arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _score_shard(
+    lo: int,
+    hi: int,
+    age: int,
+    all_ages: bool,
+    gender_code: int,
+    profession_bits: Optional[np.ndarray],
+    hobby_bits: Optional[np.ndarray],
+    social_tags: Optional[List[int]],
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Local top_k (catalog positions, scores) of gifts lo..hi-1. Terms are
+    # added in compute_match_scores order so each score is bit-identical.
+    a = _arrays
+    min_age = a["min_age"][lo:hi]
+    max_age = a["max_age"][lo:hi]
+    if all_ages:
+        rows = np.arange(hi - lo)
+    else:
+        rows = np.flatnonzero((min_age - AGE_WINDOW_SLACK <= age) & (max_age + AGE_WINDOW_SLACK >= age))
+    positions = rows + lo
+
+    score = a["trend"][positions].copy()
+    fits = (min_age[rows] <= age) & (age <= max_age[rows])
+    score += np.where(fits, AGE_FIT_BONUS, AGE_MISS_PENALTY)
+    gender_ok = a["gender_any"][positions] | (a["gender_code"][positions] == gender_code)
+    score += np.where(gender_ok, GENDER_MATCH_BONUS, 0.0)
+    if profession_bits is not None:
+        score += popcount(a["profession_bits"][positions] & profession_bits) * PROFESSION_MATCH_WEIGHT
+    if hobby_bits is not None:
+        score += popcount(a["hobby_bits"][positions] & hobby_bits) * HOBBY_MATCH_WEIGHT
+    if social_tags is not None:
+        score += _shard_social_counts(lo, hi, social_tags)[rows] * SOCIAL_TAG_WEIGHT
+
+    top = select_top_k(score, a["trend"][positions], a["name_rank"][positions], positions, top_k)
+    return positions[top], score[top]
+
+
+def _shard_social_counts(lo: int, hi: int, tags: List[int]) -> np.ndarray:
+    # Mentioned social tags per gift, for positions lo..hi-1. Each tag's
+    # postings are in position order, so a shard slices its own range.
+    offsets, positions = _arrays["social_offsets"], _arrays["social_positions"]
+    parts = [np.empty(0, dtype=np.int64)]
+    for tag in tags:
+        postings = positions[offsets[tag] : offsets[tag + 1]]
+        parts.append(postings[np.searchsorted(postings, lo) : np.searchsorted(postings, hi)])
+    return np.bincount(np.concatenate(parts) - lo, minlength=hi - lo)
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+class ParallelScorer:
+    # recommend_gifts across a process pool. The catalog's scoring columns
+    # are copied once into shared memory and mapped by every worker at
+    # start-up, so a task carries only the encoded profile and a shard range.
+    # Each shard returns its local top_k; merging those under select_top_k's
+    # total order gives exactly the single-process result. Has the same
+    # recommend() signature as IncrementalScorer, so it can be passed as
+    # cached_recommend_gifts(scorer=...).
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        index: GiftIndex,
+        workers: Optional[int] = None,
+        shards: Optional[int] = None,
+    ) -> None:
+        self.df = df
+        self.workers = workers or os.cpu_count() or 1
+        self.catalog_version = df.attrs.get("catalog_version")
+        n = len(df)
+        shards = max(1, min(shards or self.workers, n))
+        bounds = np.linspace(0, n, shards + 1).astype(np.int64)
+        self.shards = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        vocab = df.attrs["tag_vocab"]
+        self._profession_vocab = vocab["profession_match"]
+        self._hobby_vocab = vocab["hobby_tags"]
+        self._tags = index.tags
+        social_keys = list(index.tags.social)
+        self._social_ids = {tag: i for i, tag in enumerate(social_keys)}
+        social_offsets = np.zeros(len(social_keys) + 1, dtype=np.int64)
+        np.cumsum([len(index.tags.social[tag]) for tag in social_keys], out=social_offsets[1:])
+        social_positions = np.concatenate([index.tags.social[tag] for tag in social_keys] or [np.empty(0, np.int64)])
+        gender_pref = df["gender_pref"].astype(str)
+        gender_codes, self._genders = pd.factorize(gender_pref.str.lower())
+        self._genders = list(self._genders)
+
+        min_age = df["min_age"].to_numpy(dtype=np.int64)
+        max_age = df["max_age"].to_numpy(dtype=np.int64)
+        self._window_ages = _window_ages(min_age, max_age)
+        self._trend = df["social_trend_score"].to_numpy(dtype=np.float64)
+        self._ids = df.index.to_numpy()
+        # (name, id) order as one integer, so workers need no strings
+        self._name_rank = np.empty(n, dtype=np.int64)
+        names = name_order(df)
+        self._name_rank[np.lexsort((self._ids, names.astype(str) if names.dtype == object else names))] = np.arange(n)
+
+        self._blocks: List[SharedMemory] = []
+        specs = {
+            key: self._share(array)
+            for key, array in {
+                "trend": self._trend,
+                "min_age": min_age,
+                "max_age": max_age,
+                "gender_any": (gender_pref == "Any").to_numpy(),
+                "gender_code": gender_codes.astype(np.int32),
+                "name_rank": self._name_rank,
+                "profession_bits": df[bit_columns(df, "profession_match")].to_numpy(dtype=np.uint64),
+                "hobby_bits": df[bit_columns(df, "hobby_tags")].to_numpy(dtype=np.uint64),
+                "social_offsets": social_offsets,
+                "social_positions": social_positions.astype(np.int64),
+            }.items()
+        }
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(specs,),
+        )
+
+    def _share(self, array: np.ndarray) -> ArraySpec:
+        array = np.ascontiguousarray(array)
+        block = SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        self._blocks.append(block)
+        return block.name, array.shape, array.dtype.str
+
+    def recommend(
+        self,
+        age: int,
+        gender: str,
+        professions: List[str],
+        hobbies: List[str],
+        social_interests: str,
+        top_k: int = 10,
+    ) -> pd.DataFrame:
+        gender = gender.lower()
+        gender_code = self._genders.index(gender) if gender in self._genders else -1
+        profession_bits = encode_tag_bits(professions, self._profession_vocab) if professions else None
+        hobby_bits = encode_tag_bits(hobbies, self._hobby_vocab) if hobbies else None
+        social_tags = None
+        if (social_interests or "").strip():
+            # The automaton runs once here; shards only count postings
+            social_tags = [self._social_ids[tag] for tag in match_social_tags(self._tags, social_interests)]
+        all_ages = not self._window_ages.get(int(age), False)
+
+        jobs = [
+            self._pool.submit(
+                _score_shard, lo, hi, age, all_ages, gender_code, profession_bits, hobby_bits, social_tags, top_k
+            )
+            for lo, hi in self.shards
+        ]
+        parts = [job.result() for job in jobs]
+        positions = np.concatenate([p for p, _ in parts])
+        scores = np.concatenate([s for _, s in parts])
+        top = select_top_k(scores, self._trend[positions], self._name_rank[positions], self._ids[positions], top_k)
+        recs = self.df.iloc[positions[top]].copy()
+        recs["match_score"] = scores[top]
+        return decode_rows(recs)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _window_ages(min_age: np.ndarray, max_age: np.ndarray) -> Dict[int, bool]:
+    # Ages whose relaxed window holds at least one gift; for any other age
+    # recommend_gifts falls back to scoring the whole catalog
+    if len(min_age) == 0:
+        return {}
+    first = int(min_age.min()) - AGE_WINDOW_SLACK
+    last = int(max_age.max()) + AGE_WINDOW_SLACK
+    cover = np.zeros(last - first + 2, dtype=np.int64)
+    np.add.at(cover, min_age - AGE_WINDOW_SLACK - first, 1)
+    np.add.at(cover, max_age + AGE_WINDOW_SLACK - first + 1, -1)
+    covered = np.cumsum(cover)[:-1] > 0
+    return {first + i: True for i in np.flatnonzero(covered)}
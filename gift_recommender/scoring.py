@@ -0,0 +1,370 @@
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .compact_catalog import catalog_column, decode_rows, name_order
+from .encoding import bit_columns, count_tag_overlap, encode_tag_bits, popcount
+from .indexes import (
+    AGE_FIT_BONUS,
+    AGE_MISS_PENALTY,
+    AGE_WINDOW_SLACK,
+    GENDER_MATCH_BONUS,
+    HOBBY_MATCH_WEIGHT,
+    PROFESSION_MATCH_WEIGHT,
+    SOCIAL_TAG_WEIGHT,
+    GiftIndex,
+    SocialMatches,
+    age_fit,
+    age_window_mask,
+    build_social_matcher,
+    lookup_candidates,
+    match_social,
+    mentions_social_tag,
+    social_bonus,
+    tokenize_social,
+)
+from .result_cache import TTLCache
+from .timing import current_timer
+
+if TYPE_CHECKING:
+    from .incremental import IncrementalScorer
+    from .materialized import MaterializedTable
+    from .parallel import ParallelScorer
+    from .shared_cache import SharedCache
+
+
+# -----------------------------
+# Matching & Scoring Logic
+# -----------------------------
+def compute_match_score(
+    gift: pd.Series,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+) -> float:
+    score = float(gift["social_trend_score"])  # base signal
+
+    # Age fit
+    if gift["min_age"] <= age <= gift["max_age"]:
+        score += AGE_FIT_BONUS
+    else:
+        # soft penalty if out of range
+        score += AGE_MISS_PENALTY
+
+    # Gender preference
+    if gift["gender_pref"] == "Any" or gift["gender_pref"].lower() == gender.lower():
+        score += GENDER_MATCH_BONUS
+
+    # Profession overlap
+    if professions:
+        match_count = len(set(professions) & set(gift["profession_match"]))
+        score += match_count * PROFESSION_MATCH_WEIGHT
+
+    # Hobby overlap
+    if hobbies:
+        match_count = len(set(hobbies) & set(gift["hobby_tags"]))
+        score += match_count * HOBBY_MATCH_WEIGHT
+
+    # Social tags mentioned in the social interest text
+    words = tokenize_social(social_interests)
+    if words:
+        match_count = sum(mentions_social_tag(words, tag) for tag in set(gift["social_tags"]))
+        score += match_count * SOCIAL_TAG_WEIGHT
+
+    return score
+
+
+def compute_match_scores(
+    df: pd.DataFrame,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+    index: Optional[GiftIndex] = None,
+    social: Optional[SocialMatches] = None,
+) -> np.ndarray:
+    # Whole-catalog version of compute_match_score. Terms are added in the
+    # same order so the resulting floats match it. social, if given, is
+    # match_social's result for social_interests.
+    score = df["social_trend_score"].to_numpy(dtype=np.float64).copy()  # base signal
+
+    # Age fit
+    if index is not None:
+        fits = age_fit(index.ages, age, df.index.to_numpy())
+    else:
+        min_age = df["min_age"].to_numpy()
+        max_age = df["max_age"].to_numpy()
+        fits = (min_age <= age) & (age <= max_age)
+    score += np.where(fits, AGE_FIT_BONUS, AGE_MISS_PENALTY)
+
+    # Gender preference
+    gender_pref = df["gender_pref"]
+    gender_ok = (gender_pref == "Any") | (gender_pref.str.lower() == gender.lower())
+    score += np.where(gender_ok.to_numpy(), GENDER_MATCH_BONUS, 0.0)
+
+    # Profession overlap
+    if professions:
+        score += count_tag_overlap(df, "profession_match", professions) * PROFESSION_MATCH_WEIGHT
+
+    # Hobby overlap
+    if hobbies:
+        score += count_tag_overlap(df, "hobby_tags", hobbies) * HOBBY_MATCH_WEIGHT
+
+    # Social tags mentioned in the social interest text
+    words = tokenize_social(social_interests)
+    if words:
+        if social is None and index is not None:
+            social = match_social(index.tags, social_interests)
+        if social is not None:
+            score += social_bonus(social, df.index.to_numpy())
+        else:
+            # No index: match against this frame's own tags
+            social_tags = catalog_column(df, "social_tags")
+            matched = set(build_social_matcher(set().union(*social_tags)).tags(words))
+            counts = np.fromiter((len(matched.intersection(tags)) for tags in social_tags), np.int64, len(df))
+            score += counts * SOCIAL_TAG_WEIGHT
+
+    return score
+
+
+def _score_positions(
+    df: pd.DataFrame,
+    index: GiftIndex,
+    positions: np.ndarray,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social: Optional[SocialMatches],
+) -> np.ndarray:
+    # compute_match_scores for the given catalog positions, straight from the
+    # column arrays (no per-call frame), adding terms in the same order so
+    # the floats are identical
+    score = df["social_trend_score"].to_numpy(dtype=np.float64)[positions]
+    score += np.where(age_fit(index.ages, age, positions), AGE_FIT_BONUS, AGE_MISS_PENALTY)
+
+    gender_pref = df["gender_pref"]
+    if isinstance(gender_pref.dtype, pd.CategoricalDtype):
+        ok_by_code = np.array(
+            [pref == "Any" or pref.lower() == gender.lower() for pref in gender_pref.cat.categories], dtype=bool
+        )
+        gender_ok = ok_by_code[gender_pref.cat.codes.to_numpy()[positions]]
+    else:
+        prefs = gender_pref.iloc[positions]
+        gender_ok = ((prefs == "Any") | (prefs.str.lower() == gender.lower())).to_numpy()
+    score += np.where(gender_ok, GENDER_MATCH_BONUS, 0.0)
+
+    for column, wanted, weight in (
+        ("profession_match", professions, PROFESSION_MATCH_WEIGHT),
+        ("hobby_tags", hobbies, HOBBY_MATCH_WEIGHT),
+    ):
+        if wanted:
+            query = encode_tag_bits(wanted, df.attrs["tag_vocab"][column])
+            bits = np.stack([df[c].to_numpy(dtype=np.uint64)[positions] for c in bit_columns(df, column)], axis=1)
+            score += popcount(bits & query) * weight
+
+    if social is not None:
+        score += social_bonus(social, positions)
+    return score
+
+
+def _score_indexed(
+    df: pd.DataFrame,
+    index: GiftIndex,
+    in_window: np.ndarray,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (catalog positions, match scores) of every gift that could make the
+    # top_k: all tag/social matches, plus trend backfill
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    social = match_social(index.tags, social_interests) if tokenize_social(social_interests) else None
+    # Social matches are in the candidates too, through the same postings
+    is_matched = np.zeros(len(df), dtype=bool)
+    is_matched[lookup_candidates(index.tags, professions, hobbies, social_interests)] = True
+    matched = np.flatnonzero(is_matched)
+    matched = matched[in_window[matched]]
+    current_timer().count("candidates_matched", len(matched))
+
+    def score(positions: np.ndarray) -> np.ndarray:
+        return _score_positions(df, index, positions, age, gender, professions, hobbies, social)
+
+    positions, scores = [matched], [score(matched)]
+    # The top_k best scores so far; best[0] is the k-th best once full
+    best = np.sort(scores[0])[-top_k:]
+
+    # Trend-ranked backfill. A gift outside every posting list and without a
+    # social match has no profession/hobby/social term, so its score is at
+    # most trend + AGE_FIT_BONUS + GENDER_MATCH_BONUS. Walk the rest in trend
+    # order, in blocks that double in size, and stop once that bound falls
+    # below the current k-th best score.
+    bound = AGE_FIT_BONUS + GENDER_MATCH_BONUS
+    order = index.tags.trend_order
+    trend = df["social_trend_score"].to_numpy(dtype=np.float64)
+    start, block = 0, max(top_k, 32)
+    while start < len(order):
+        if len(best) >= top_k and trend[order[start]] + bound < best[0] - 1e-9:
+            break
+        chunk = order[start : start + block]
+        chunk = chunk[in_window[chunk] & ~is_matched[chunk]]
+        chunk_scores = score(chunk)
+        positions.append(chunk)
+        scores.append(chunk_scores)
+        best = np.sort(np.concatenate([best, chunk_scores]))[-top_k:]
+        start += block
+        block *= 2
+
+    return np.concatenate(positions), np.concatenate(scores)
+
+
+def select_top_k(
+    scores: np.ndarray,
+    trend: np.ndarray,
+    names: np.ndarray,
+    ids: np.ndarray,
+    top_k: int,
+) -> np.ndarray:
+    # Positions of the top_k scores, ordered by score, then trend score, then
+    # name, then catalog id. Partitioning finds the k-th best score; only
+    # gifts at or above it (ties included) are sorted.
+    n = len(scores)
+    if top_k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < n:
+        kth = np.partition(scores, n - top_k)[n - top_k]
+        winners = np.flatnonzero(scores >= kth)
+    else:
+        winners = np.arange(n)
+    winners = sorted(winners, key=lambda i: (-scores[i], -trend[i], names[i], ids[i]))
+    return np.asarray(winners[:top_k], dtype=np.int64)
+
+
+def recommend_gifts(
+    df: pd.DataFrame,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+    top_k: int = 10,
+    index: Optional[GiftIndex] = None,
+) -> pd.DataFrame:
+    timer = current_timer()
+
+    # Filter by a relaxed age window first to keep scoring efficient
+    with timer.stage("age_filter"):
+        if index is not None:
+            in_window = age_window_mask(index.ages, age)
+        else:
+            in_window = (
+                (df["min_age"] - AGE_WINDOW_SLACK <= age) & (df["max_age"] + AGE_WINDOW_SLACK >= age)
+            ).to_numpy()
+        if not in_window.any():
+            in_window = np.ones(len(df), dtype=bool)
+
+    if index is not None:
+        with timer.stage("scoring"):
+            # Only score tag matches plus as much trend backfill as can still
+            # reach the top_k, on position arrays; see _score_indexed
+            positions, scores = _score_indexed(
+                df, index, in_window, age, gender, professions, hobbies, social_interests, top_k
+            )
+        timer.count("candidates_scored", len(positions))
+        with timer.stage("top_k"):
+            top = select_top_k(
+                scores,
+                df["social_trend_score"].to_numpy(dtype=np.float64)[positions],
+                name_order(df)[positions],
+                df.index[positions].to_numpy(),
+                top_k,
+            )
+            # Only the winners become a frame
+            recs = df.iloc[positions[top]].copy()
+            recs["match_score"] = scores[top]
+            return decode_rows(recs)
+
+    with timer.stage("scoring"):
+        rough = df[in_window].copy()
+        rough["match_score"] = compute_match_scores(rough, age, gender, professions, hobbies, social_interests)
+    timer.count("candidates_scored", len(rough))
+
+    with timer.stage("top_k"):
+        top = select_top_k(
+            rough["match_score"].to_numpy(),
+            rough["social_trend_score"].to_numpy(),
+            name_order(rough),
+            rough.index.to_numpy(),
+            top_k,
+        )
+        return decode_rows(rough.iloc[top])
+
+
+def profile_key(
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+    top_k: int,
+) -> tuple:
+    # Profiles that recommend_gifts scores identically share a key
+    return (
+        int(age),
+        gender.lower(),
+        tuple(sorted(set(professions))),
+        tuple(sorted(set(hobbies))),
+        " ".join(tokenize_social(social_interests)),
+        int(top_k),
+    )
+
+
+def cached_recommend_gifts(
+    cache: TTLCache,
+    df: pd.DataFrame,
+    age: int,
+    gender: str,
+    professions: List[str],
+    hobbies: List[str],
+    social_interests: str,
+    top_k: int = 10,
+    index: Optional[GiftIndex] = None,
+    scorer: Optional[Union["IncrementalScorer", "ParallelScorer"]] = None,
+    shared: Optional["SharedCache"] = None,
+    table: Optional["MaterializedTable"] = None,
+) -> pd.DataFrame:
+    # Process cache first, then the host-wide shared tier if given. On a miss
+    # in both, a precomputed table answers discrete profiles it covers;
+    # otherwise the scorer, if given (a session's IncrementalScorer or a
+    # ParallelScorer), does the scoring.
+    key = profile_key(age, gender, professions, hobbies, social_interests, top_k)
+    version = df.attrs.get("catalog_version")
+    timer = current_timer()
+    recs = cache.get(key, version)
+    timer.count("cache_hits", recs is not None)
+    if recs is None and shared is not None:
+        recs = shared.get_result(key, version, df)
+        timer.count("shared_cache_hits", recs is not None)
+        if recs is not None:
+            cache.put(key, recs, version)
+            return recs
+    if recs is None:
+        if table is not None and index is not None:
+            recs = table.recommend(df, index, age, gender, professions, hobbies, social_interests, top_k)
+        if recs is None and scorer is not None:
+            recs = scorer.recommend(age, gender, professions, hobbies, social_interests, top_k)
+        elif recs is None:
+            recs = recommend_gifts(df, age, gender, professions, hobbies, social_interests, top_k, index=index)
+        cache.put(key, recs, version)
+        if shared is not None:
+            # Best-effort; a locked or failing cache never fails the request
+            shared.put_result(key, recs, version)
+    return recs
@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from .batch import ProfileError, normalize_profile
+from .catalog_manager import CatalogManager, CatalogSnapshot
+from .materialized import MaterializedTable
+from .parallel import ParallelScorer
+from .result_cache import TTLCache
+from .shared_cache import SharedCache
+from .scoring import cached_recommend_gifts
+
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_TOP_K = 100
+RESULT_FIELDS = ("name", "match_score", "social_trend_score", "price_range", "image_url", "buy_link", "why_base")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class RecommendationService:
+    # Minimal HTTP/1.1 JSON front end for recommend_gifts. The catalog and its
+    # indexes stay resident (and are hot-swapped by the CatalogManager);
+    # scoring runs on a thread pool. At most max_pending scoring jobs may be
+    # queued or running (a timed-out request's job counts until it actually
+    # finishes); beyond that the service answers 503 straight away instead
+    # of queueing more work.
+
+    def __init__(
+        self,
+        catalog: CatalogManager,
+        workers: int = 4,
+        max_pending: int = 64,
+        request_timeout: float = 10.0,
+        keepalive_timeout: float = 15.0,
+        cache: Optional[TTLCache] = None,
+        score_processes: int = 0,
+        shared: Optional[SharedCache] = None,
+        table: Optional[MaterializedTable] = None,
+    ) -> None:
+        self.catalog = catalog
+        self.shared = shared
+        self.table = table
+        self.score_processes = score_processes
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache if cache is not None else TTLCache()
+        self.scorer: Optional[ParallelScorer] = None
+        if score_processes > 0:
+            self._swap_scorer(catalog.current())
+            catalog.add_listener(self._swap_scorer)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recommend")
+        self._pending = 0
+
+    def _swap_scorer(self, snapshot: CatalogSnapshot) -> None:
+        # Runs on the reload thread. The old pool is shut down only after
+        # request_timeout, so requests already scoring on it can finish.
+        previous = self.scorer
+        self.scorer = ParallelScorer(snapshot.df, snapshot.index, workers=self.score_processes)
+        if previous is not None:
+            threading.Timer(self.request_timeout, previous.close).start()
+
+    # -----------------------------
+    # Request handling
+    # -----------------------------
+    def _recommend(self, profile: Dict[str, Any], top_k: int) -> Dict[str, Any]:
+        # Everything below uses this one snapshot, even if a reload lands
+        snapshot = self.catalog.current()
+        scorer = self.scorer
+        if scorer is not None and scorer.catalog_version != snapshot.version:
+            scorer = None
+        recs = cached_recommend_gifts(
+            self.cache,
+            snapshot.df,
+            profile["age"],
+            profile["gender"],
+            profile["professions"],
+            profile["hobbies"],
+            profile["social_interests"],
+            top_k,
+            index=snapshot.index,
+            scorer=scorer,
+            shared=self.shared,
+            table=self.table,
+        )
+        items = []
+        for gift_id, row in zip(recs.index, recs[list(RESULT_FIELDS)].itertuples(index=False)):
+            item = {"gift_id": int(gift_id)}
+            item.update({field: _json_value(value) for field, value in zip(RESULT_FIELDS, row)})
+            items.append(item)
+        return {"catalog_version": snapshot.version, "recommendations": items}
+
+    async def recommend(self, payload: Any) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise HttpError(400, "request body must be a JSON object")
+        try:
+            profile = normalize_profile(payload, "request")
+        except ProfileError as exc:
+            raise HttpError(400, str(exc)) from exc
+        try:
+            top_k = int(payload.get("top_k", 10))
+        except (TypeError, ValueError) as exc:
+            raise HttpError(400, "top_k must be an integer") from exc
+        if not 1 <= top_k <= MAX_TOP_K:
+            raise HttpError(400, f"top_k must be between 1 and {MAX_TOP_K}")
+
+        if self._pending >= self.max_pending:
+            raise HttpError(503, "too many pending requests")
+        # The slot is released when the scoring work finishes, not when this
+        # request stops waiting: a timed-out job keeps its pool thread busy
+        loop = asyncio.get_running_loop()
+        job = self._pool.submit(self._recommend, profile, top_k)
+        self._pending += 1
+        job.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.request_timeout)
+        except asyncio.TimeoutError as exc:
+            raise HttpError(504, "scoring timed out") from exc
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Done-callback of a scoring job; runs on the pool thread that ran it
+        def release() -> None:
+            self._pending -= 1
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # Event loop already closed; nothing is waiting on the count
+            pass
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "pending": self._pending,
+                "catalog_version": self.catalog.current().version,
+                "catalog_reloads": self.catalog.reloads,
+                "cache": self.cache.stats(),
+                "shared_cache": self.shared.stats() if self.shared is not None else None,
+            }
+        if path != "/recommend":
+            raise HttpError(404, f"no route for {path}")
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            raise HttpError(400, "invalid JSON") from exc
+        return 200, await self.recommend(payload)
+
+    # -----------------------------
+    # HTTP/1.1 connection loop
+    # -----------------------------
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "invalid Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "request body too large")
+        body = b""
+        if length:
+            body = await asyncio.wait_for(reader.readexactly(length), self.request_timeout)
+        return method.upper(), target.split("?", 1)[0], version, headers, body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, version, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                    status, payload = await self.dispatch(method, path, body)
+                except HttpError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except Exception:
+                    logger.exception("request failed")
+                    status, payload = 500, {"error": "internal error"}
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _write_response(
+        self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool
+    ) -> None:
+        body = json.dumps(payload).encode()
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Internal Server Error')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if keep_alive:
+            head.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info("serving recommendations on http://%s:%d", host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.catalog.stop()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            if self.scorer is not None:
+                self.scorer.close()
+
+
+def _json_value(value: Any) -> Any:
+    return value.item() if hasattr(value, "item") else value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve gift recommendations over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request scoring timeout in seconds")
+    parser.add_argument(
+        "--score-processes", type=int, default=0, help="score each request across N processes (0: in-process)"
+    )
+    parser.add_argument("--shared-cache", help="SQLite file shared with other workers on this host")
+    parser.add_argument("--table", help="directory written by python -m gift_recommender.materialized")
+    parser.add_argument(
+        "--reload-poll", type=float, default=2.0, help="seconds between checks of GIFT_CATALOG_PATH for changes"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    shared = SharedCache(args.shared_cache) if args.shared_cache else None
+    service = RecommendationService(
+        CatalogManager(poll_seconds=args.reload_poll, shared=shared).start(),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        request_timeout=args.timeout,
+        score_processes=args.score_processes,
+        shared=shared,
+        table=MaterializedTable(args.table) if args.table else None,
+    )
+    asyncio.run(service.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
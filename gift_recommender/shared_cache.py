@@ -0,0 +1,254 @@
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compact_catalog import decode_rows
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    positions BLOB NOT NULL,
+    scores BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (version, key)
+);
+CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at);
+"""
+
+logger = logging.getLogger(__name__)
+
+# Expired/LRU eviction runs on every EVICT_EVERY-th result insert per process
+EVICT_EVERY = 64
+# Larger pickled artifacts are not stored (SQLite's blob limit is ~1 GB)
+DEFAULT_MAX_ARTIFACT_BYTES = 512 * 1024 * 1024
+# How long a write waits for another process's write lock before giving up;
+# short, since writes happen on the request path and are optional
+WRITE_TIMEOUT_SECONDS = 0.25
+
+
+class SharedCache:
+    # Second cache tier shared by every process on the host, in one SQLite
+    # file (WAL mode, so readers never block on a writer). Holds
+    #   - built catalog artifacts (pickled CatalogSnapshot parts), keyed by the
+    #     catalog file's path/mtime/size, so a cold worker skips parsing and
+    #     index building; the newest max_artifacts are kept, and
+    #   - recommendation results as (catalog positions, match scores), keyed
+    #     by catalog version and profile_key; rebuilt against the caller's
+    #     frame on a hit. Entries expire ttl_seconds after insertion and the
+    #     least recently used are evicted beyond max_results.
+    # Only point it at a file this deployment owns: artifacts are pickles.
+    # Every operation is best-effort: a failed read is a miss, and a failed,
+    # locked-out or oversized write is logged and counted, never raised, so
+    # the cache can't fail a load or a request. Hits don't write: their
+    # used_at updates are queued and applied with the next write.
+
+    def __init__(
+        self,
+        path: str,
+        max_results: int = 100_000,
+        ttl_seconds: float = 600.0,
+        max_artifacts: int = 2,
+        clock: Callable[[], float] = time.time,
+        max_artifact_bytes: int = DEFAULT_MAX_ARTIFACT_BYTES,
+    ) -> None:
+        self.path = path
+        self.max_results = max_results
+        self.ttl_seconds = ttl_seconds
+        self.max_artifacts = max_artifacts
+        self.max_artifact_bytes = max_artifact_bytes
+        self._clock = clock
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.read_errors = 0
+        self.write_errors = 0
+        self._puts = 0
+        # (version, key) -> last hit time, not yet written to used_at
+        self._touched: Dict[Tuple[str, str], float] = {}
+        conn = self._connect()
+        # Creating the schema may wait out another process's write
+        conn.execute("PRAGMA busy_timeout = 10000")
+        with conn:
+            conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA busy_timeout = {int(WRITE_TIMEOUT_SECONDS * 1000)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shareable
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=WRITE_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -----------------------------
+    # Catalog artifacts
+    # -----------------------------
+    def get_artifact(self, key: str) -> Optional[Any]:
+        # None on a miss, and on a row that can't be read or unpickled
+        try:
+            row = self._connect().execute("SELECT payload FROM artifacts WHERE key = ?", (key,)).fetchone()
+            return pickle.loads(row[0]) if row is not None else None
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, ImportError, EOFError) as exc:
+            self.read_errors += 1
+            logger.warning("shared cache: reading artifact %s failed (%s)", key, exc)
+            return None
+
+    def put_artifact(self, key: str, value: Any) -> bool:
+        # True if stored
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(payload) > self.max_artifact_bytes:
+                logger.info(
+                    "shared cache: artifact %s not stored, %d bytes is over the %d byte cap",
+                    key,
+                    len(payload),
+                    self.max_artifact_bytes,
+                )
+                return False
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (key, payload, stored_at) VALUES (?, ?, ?)",
+                    (key, payload, self._clock()),
+                )
+                conn.execute(
+                    "DELETE FROM artifacts WHERE key NOT IN "
+                    "(SELECT key FROM artifacts ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_artifacts,),
+                )
+        except (sqlite3.Error, pickle.PicklingError, MemoryError, OverflowError) as exc:
+            self.write_errors += 1
+            logger.warning("shared cache: storing artifact %s failed (%s)", key, exc)
+            return False
+        return True
+
+    # -----------------------------
+    # Recommendation results
+    # -----------------------------
+    def get_result(self, key: Hashable, version: Optional[str], df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        # Read-only, so a writer in another process never blocks it
+        now = self._clock()
+        row_key = (version or "", _key_text(key))
+        try:
+            row = (
+                self._connect()
+                .execute("SELECT positions, scores, stored_at FROM results WHERE version = ? AND key = ?", row_key)
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            self.read_errors += 1
+            logger.warning("shared cache: reading a result failed (%s)", exc)
+            row = None
+        if row is None or now - row[2] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self._touched[row_key] = now
+        self.hits += 1
+        recs = df.iloc[np.frombuffer(row[0], dtype=np.int64)].copy()
+        recs["match_score"] = np.frombuffer(row[1], dtype=np.float64)
+        return decode_rows(recs)
+
+    def put_result(self, key: Hashable, recs: pd.DataFrame, version: Optional[str]) -> bool:
+        # True if stored
+        now = self._clock()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (version, key, positions, scores, stored_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        version or "",
+                        _key_text(key),
+                        recs.index.to_numpy(dtype=np.int64).tobytes(),
+                        recs["match_score"].to_numpy(dtype=np.float64).tobytes(),
+                        now,
+                        now,
+                    ),
+                )
+                self._flush_touched(conn)
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error as exc:
+            self.write_errors += 1
+            logger.warning("shared cache: storing a result failed (%s)", exc)
+            return False
+        return True
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        # Apply queued hit times inside the caller's write transaction
+        touched, self._touched = self._touched, {}
+        conn.executemany(
+            "UPDATE results SET used_at = MAX(used_at, ?) WHERE version = ? AND key = ?",
+            [(used_at, version, key) for (version, key), used_at in touched.items()],
+        )
+
+    def evict(self) -> bool:
+        # True if eviction ran
+        now = self._clock()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._flush_touched(conn)
+                conn.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_results,),
+                )
+        except sqlite3.Error as exc:
+            self.write_errors += 1
+            logger.warning("shared cache: eviction failed (%s)", exc)
+            return False
+        return True
+
+    def clear(self) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM artifacts")
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        # Row counts are None when the file can't be read
+        try:
+            conn = self._connect()
+            results = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            artifacts = conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        except sqlite3.Error as exc:
+            self.read_errors += 1
+            logger.warning("shared cache: reading stats failed (%s)", exc)
+            results = artifacts = None
+        return {
+            "results": results,
+            "artifacts": artifacts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "read_errors": self.read_errors,
+            "write_errors": self.write_errors,
+        }
+
+
+def _key_text(key: Hashable) -> str:
+    # profile_key tuples are ints/strings/tuples, so JSON is a stable encoding
+    return json.dumps(key, separators=(",", ":"))
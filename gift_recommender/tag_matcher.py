@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class TagMatcher:
+    # Aho-Corasick automaton over word sequences. Each phrase (a tuple of
+    # words) maps to the tag it stands for; scan() walks the input words once
+    # and reports every phrase occurrence, overlapping ones included, so the
+    # cost is linear in the input (plus matches), whatever the number of
+    # phrases. Words, not characters, are the alphabet, so matches always
+    # fall on word boundaries ("tok" never matches inside "booktok").
+
+    def __init__(self, phrases: Iterable[Tuple[Tuple[str, ...], str]]) -> None:
+        # State 0 is the root; _goto[s] maps a word to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (phrase length, tag) for every phrase ending in this state,
+        # including those reached through failure links
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        for words, tag in phrases:
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                nxt = self._goto[state].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][word] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            if (len(words), tag) not in self._out[state]:
+                self._out[state].append((len(words), tag))
+        self._link()
+
+    def _link(self) -> None:
+        # Breadth-first, so a state's failure target is final before its
+        # children are linked
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def scan(self, words: Sequence[str]) -> List[Tuple[int, int, str]]:
+        # (start, end, tag) word spans of every match, by end position
+        matches = []
+        state = 0
+        for i, word in enumerate(words):
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            for length, tag in self._out[state]:
+                matches.append((i + 1 - length, i + 1, tag))
+        return matches
+
+    def tags(self, words: Sequence[str]) -> List[str]:
+        # Distinct matched tags, overlapping matches included, in order of
+        # first occurrence
+        seen: Dict[str, None] = {}
+        for _, _, tag in sorted(self.scan(words)):
+            seen.setdefault(tag, None)
+        return list(seen)
+
+    def rewrite(self, words: Sequence[str]) -> List[str]:
+        # Replace matches, leftmost-longest and non-overlapping, by their
+        # tag's words; unmatched words pass through
+        out: List[str] = []
+        pos = 0
+        for start, end, tag in sorted(self.scan(words), key=lambda m: (m[0], m[0] - m[1])):
+            if start < pos:
+                continue
+            out.extend(words[pos:start])
+            out.append(tag)
+            pos = end
+        out.extend(words[pos:])
+        return out
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+
+logger = logging.getLogger(__name__)
+
+# Card image slot is 16:9 (180px high in a ~320px column); the 2x variant
+# covers high-density screens
+THUMB_WIDTHS = (320, 640)
+THUMB_ASPECT = 9 / 16
+THUMB_QUALITY = 80
+THUMB_FORMAT = "webp"
+FETCH_TIMEOUT = 10.0
+MANIFEST_NAME = "manifest.json"
+
+
+def read_source(url: str, timeout: float = FETCH_TIMEOUT) -> bytes:
+    # Image bytes from an http(s) URL, a file:// URL or a plain local path
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https"):
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return resp.read()
+    path = unquote(parsed.path) if parsed.scheme == "file" else url
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def render_thumbnails(data: bytes, widths: Iterable[int] = THUMB_WIDTHS) -> Dict[int, bytes]:
+    # Center-crop to the card aspect and encode one image per width
+    try:
+        from PIL import Image, ImageOps
+    except ImportError as exc:
+        raise RuntimeError("Building thumbnails requires Pillow") from exc
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        out = {}
+        for width in widths:
+            size = (width, round(width * THUMB_ASPECT))
+            buf = io.BytesIO()
+            ImageOps.fit(img, size, Image.LANCZOS).save(buf, THUMB_FORMAT, quality=THUMB_QUALITY)
+            out[width] = buf.getvalue()
+    return out
+
+
+class ThumbnailCache:
+    # Content-addressed thumbnails on disk: <digest>-<width>.webp, where digest
+    # hashes the source bytes, so sources that are byte-identical share one set
+    # of files and a file never changes once written. manifest.json maps each
+    # source URL to its digest so known URLs are neither fetched nor decoded
+    # again. Safe to share between threads.
+
+    def __init__(self, cache_dir: str, widths: Iterable[int] = THUMB_WIDTHS) -> None:
+        self.cache_dir = cache_dir
+        self.widths = tuple(widths)
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, str] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(os.path.join(cache_dir, MANIFEST_NAME)) as fh:
+                self._manifest = json.load(fh)
+        except (OSError, ValueError):
+            pass
+
+    def filename(self, digest: str, width: int) -> str:
+        return f"{digest}-{width}.{THUMB_FORMAT}"
+
+    def _complete(self, digest: str) -> bool:
+        return all(os.path.exists(os.path.join(self.cache_dir, self.filename(digest, w))) for w in self.widths)
+
+    def lookup(self, url: str) -> Optional[str]:
+        # Digest of an already built source, without touching the network
+        digest = self._manifest.get(url)
+        return digest if digest is not None and self._complete(digest) else None
+
+    def ensure(self, url: str) -> Optional[str]:
+        # Build the thumbnails for url if needed; None when the source cannot
+        # be read or decoded
+        digest = self.lookup(url)
+        if digest is not None:
+            return digest
+        try:
+            data = read_source(url)
+            digest = hashlib.sha1(data).hexdigest()[:16]
+            if not self._complete(digest):
+                for width, payload in render_thumbnails(data, self.widths).items():
+                    self._write(self.filename(digest, width), payload)
+        except Exception as exc:
+            logger.warning("thumbnail failed for %s: %s", url, exc)
+            return None
+        with self._lock:
+            self._manifest[url] = digest
+            self._write(MANIFEST_NAME, json.dumps(self._manifest, sort_keys=True).encode())
+        return digest
+
+    def _write(self, name: str, payload: bytes) -> None:
+        # Write-then-rename so readers never see a partial file
+        path = os.path.join(self.cache_dir, name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+
+    def build(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        # Each distinct URL is handled once
+        return {url: self.ensure(url) for url in dict.fromkeys(urls)}
+
+
+def thumbnail_srcset(cache: ThumbnailCache, digest: str, base_url: str) -> Tuple[str, str]:
+    # (src, srcset) for a built digest. ?v= marks the URL as immutable so the
+    # static file server sends a far-future Cache-Control.
+    urls = [f"{base_url}/{cache.filename(digest, w)}?v={digest}" for w in cache.widths]
+    srcset = ", ".join(f"{url} {w}w" for url, w in zip(urls, cache.widths))
+    return urls[0], srcset
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-build card thumbnails for a gift catalog.")
+    parser.add_argument("--catalog", help="catalog file (defaults to GIFT_CATALOG_PATH or the built-in catalog)")
+    parser.add_argument("--cache-dir", default=os.path.join("static", "thumbs"))
+    args = parser.parse_args(argv)
+
+    from .catalog import load_gift_catalog
+    from .catalog_loader import load_catalog
+
+    df = load_catalog(args.catalog) if args.catalog else load_gift_catalog()
+    results = ThumbnailCache(args.cache_dir).build(df["image_url"].tolist())
+    built = sum(digest is not None for digest in results.values())
+    print(json.dumps({
+        "gifts": len(df),
+        "sources": len(results),
+        "built": built,
+        "failed": len(results) - built,
+        "thumbnails": len(set(d for d in results.values() if d is not None)),
+    }))
+
+
+if __name__ == "__main__":
+    main()
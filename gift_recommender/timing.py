@@ -0,0 +1,90 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    # Wall time per named stage and integer counters for one run. Stages that
+    # run more than once accumulate.
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, n: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "total_ms": round(self.total() * 1000.0, 3),
+            "stages_ms": {name: round(s * 1000.0, 3) for name, s in self.stages.items()},
+            "counts": dict(self.counts),
+        }
+
+    def log(self, event: str = "rerun", **fields: object) -> None:
+        record = {"event": event, **fields, **self.as_dict()}
+        logger.info(json.dumps(record))
+
+
+class _NullContext:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> bool:
+        return False
+
+
+class NullTimer:
+    # Stand-in when instrumentation is off: every call is a constant no-op
+
+    enabled = False
+    _context = _NullContext()
+
+    def stage(self, name: str) -> _NullContext:
+        return self._context
+
+    def count(self, name: str, n: int) -> None:
+        pass
+
+    def log(self, event: str = "rerun", **fields: object) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+_local = threading.local()
+
+
+def current_timer():
+    # Timer for the running thread (Streamlit runs each session's script in
+    # its own thread), or NULL_TIMER
+    return getattr(_local, "timer", NULL_TIMER)
+
+
+@contextmanager
+def use_timer(timer: Optional[StageTimer]) -> Iterator[None]:
+    previous = current_timer()
+    _local.timer = timer if timer is not None else NULL_TIMER
+    try:
+        yield
+    finally:
+        _local.timer = previous
@@ -0,0 +1,43 @@
+import pytest
+
+from gift_recommender.batch import ProfileError, iter_profile_chunks, main, normalize_profile
+
+
+def test_normalize_profile():
+    profile = normalize_profile(
+        {"age": "30", "professions": "Student|Artist", "hobbies": '["Music"]', "profile_id": "p1"}, "row"
+    )
+    assert profile == {
+        "age": 30,
+        "gender": "Other",
+        "professions": ["Student", "Artist"],
+        "hobbies": ["Music"],
+        "social_interests": "",
+        "profile_id": "p1",
+    }
+
+
+@pytest.mark.parametrize(
+    "record",
+    [{}, {"age": "x"}, {"age": None}, {"age": 1e400}, {"age": 30, "hobbies": "[oops"}, {"age": 30, "hobbies": [1]}],
+)
+def test_bad_profile(record):
+    with pytest.raises(ProfileError, match="row"):
+        normalize_profile(record, "row")
+
+
+def test_unreadable_rows(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text('{"age": 30}\n{bad json\n')
+    with pytest.raises(ProfileError, match="profile 2"):
+        list(iter_profile_chunks(str(path), 10))
+    path.write_text('{"age": 30}\n[1, 2]\n')
+    with pytest.raises(ProfileError, match="profile 2: not an object"):
+        list(iter_profile_chunks(str(path), 10))
+
+
+def test_main_reports_bad_rows(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text('{"age": 1e400}\n')
+    with pytest.raises(SystemExit, match="profile 1: age must be an integer"):
+        main([str(path), "-o", str(tmp_path / "out.jsonl")])
@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+import pytest
+
+from gift_recommender.catalog_loader import (
+    CATALOG_COLUMNS,
+    LIST_FIELDS,
+    MAX_GIFT_AGE,
+    CatalogError,
+    load_catalog,
+    parse_tag_list,
+    validate_gift,
+)
+from gift_recommender.dataset import build_gift_dataset
+
+
+def gift_record(**changes):
+    record = build_gift_dataset()[list(CATALOG_COLUMNS)].iloc[0].to_dict()
+    record.update(changes)
+    return record
+
+
+@pytest.mark.parametrize("changes", [{"min_age": -1}, {"max_age": MAX_GIFT_AGE + 1}, {"max_age": 1e400}])
+def test_age_out_of_range(changes):
+    with pytest.raises(CatalogError, match="age must be"):
+        validate_gift(gift_record(**changes), "gift 1")
+
+
+def write_jsonl(path, records):
+    with open(path, "w") as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+
+
+@pytest.mark.parametrize(
+    "changes, message",
+    [
+        ({"name": None}, "missing name"),
+        ({"name": "  "}, "name must be a non-empty string"),
+        ({"min_age": "ten"}, "min_age must be an integer"),
+        ({"social_trend_score": "hot"}, "social_trend_score must be a number"),
+        ({"min_age": 40, "max_age": 20}, "min_age is greater than max_age"),
+        ({"hobby_tags": "[oops"}, "hobby_tags is not a valid JSON list"),
+        ({"hobby_tags": 5}, "hobby_tags must be a list of strings"),
+        ({"hobby_tags": ["Music", 1]}, "hobby_tags must be a list of strings"),
+    ],
+)
+def test_invalid_gift(changes, message):
+    with pytest.raises(CatalogError, match=message):
+        validate_gift(gift_record(**changes), "gift 1")
+
+
+def test_tag_list_forms():
+    assert parse_tag_list('["a", "b"]', "hobby_tags", "gift 1") == ["a", "b"]
+    assert parse_tag_list(" a | b ||", "hobby_tags", "gift 1") == ["a", "b"]
+    assert parse_tag_list(("a",), "hobby_tags", "gift 1") == ["a"]
+
+
+def test_load_formats_agree(tmp_path):
+    expected = build_gift_dataset()[list(CATALOG_COLUMNS)]
+    jsonl = tmp_path / "gifts.jsonl"
+    write_jsonl(jsonl, expected.to_dict("records"))
+    csv_path = tmp_path / "gifts.csv"
+    as_csv = expected.copy()
+    for field in LIST_FIELDS:
+        as_csv[field] = as_csv[field].map("|".join)
+    as_csv.to_csv(csv_path, index=False)
+
+    from_jsonl = load_catalog(str(jsonl), chunk_size=7)
+    from_csv = load_catalog(str(csv_path))
+    pd.testing.assert_frame_equal(from_jsonl, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(from_csv, from_jsonl)
+
+
+def test_load_errors_name_the_row(tmp_path):
+    path = tmp_path / "gifts.jsonl"
+    good = gift_record()
+    write_jsonl(path, [good, good, {**good, "min_age": "x"}])
+    with pytest.raises(CatalogError, match="gift 3: min_age"):
+        load_catalog(str(path), chunk_size=2)
+    path.write_text(json.dumps(good) + "\n{oops\n")
+    with pytest.raises(CatalogError, match=r"gifts.jsonl:2: invalid JSON"):
+        load_catalog(str(path))
+    path.write_text("\n")
+    with pytest.raises(CatalogError, match="catalog is empty"):
+        load_catalog(str(path))
+    with pytest.raises(CatalogError, match="Unsupported catalog format"):
+        load_catalog(str(tmp_path / "gifts.xml"))
@@ -0,0 +1,95 @@
+import itertools
+import json
+import os
+
+import pytest
+
+from gift_recommender.catalog_loader import CATALOG_COLUMNS
+from gift_recommender.catalog_manager import CatalogManager
+from gift_recommender.compiled_catalog import compile_catalog
+from gift_recommender.dataset import build_gift_dataset
+
+
+_ticks = itertools.count(1)
+
+def write_catalog(path, trend_bump=0.0, valid=True):
+    # Rewrites the file and moves its mtime forward, so every write is
+    # seen as a change even within the filesystem's timestamp resolution
+    records = build_gift_dataset()[list(CATALOG_COLUMNS)].to_dict("records")
+    records[0]["social_trend_score"] += trend_bump
+    if not valid:
+        records[1]["min_age"] = "x"
+    with open(path, "w") as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + next(_ticks) * 1_000_000_000))
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = str(tmp_path / "gifts.jsonl")
+    write_catalog(path)
+    return path
+
+
+def test_reload_swaps_snapshot(catalog_file):
+    manager = CatalogManager(catalog_file)
+    seen = []
+    manager.add_listener(seen.append)
+    old = manager.current()
+    assert not manager.check()  # unchanged
+
+    write_catalog(catalog_file, trend_bump=0.5)
+    assert manager.check()
+    new = manager.current()
+    assert new.version != old.version
+    assert new.df["social_trend_score"].iloc[0] == old.df["social_trend_score"].iloc[0] + 0.5
+    assert seen == [new] and manager.reloads == 1
+    # The old snapshot is untouched for requests still holding it
+    assert old.df["social_trend_score"].iloc[0] == build_gift_dataset()["social_trend_score"].iloc[0]
+
+
+def test_failed_reload_keeps_current(catalog_file):
+    manager = CatalogManager(catalog_file)
+    before = manager.current()
+    write_catalog(catalog_file, valid=False)
+    assert not manager.check()
+    assert manager.current() is before
+    assert (manager.failures, manager.reloads) == (1, 0)
+
+
+def test_same_content_is_not_a_reload(catalog_file):
+    manager = CatalogManager(catalog_file)
+    before = manager.current()
+    write_catalog(catalog_file)
+    assert not manager.check()
+    assert manager.current() is before and manager.reloads == 0
+
+
+def test_compiled_catalog_reload(tmp_path, catalog_file):
+    out = str(tmp_path / "compiled")
+    compile_catalog(out, catalog_file)
+    manager = CatalogManager(out)
+    before = manager.current()
+    write_catalog(catalog_file, trend_bump=1.0)
+    compile_catalog(out, catalog_file)
+    manifest = os.path.join(out, "manifest.json")
+    stat = os.stat(manifest)
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert manager.check()
+    assert manager.current().version != before.version
+
+
+def test_watch_thread_reloads(catalog_file):
+    manager = CatalogManager(catalog_file, poll_seconds=0.05).start()
+    try:
+        before = manager.current().version
+        write_catalog(catalog_file, trend_bump=2.0)
+        for _ in range(100):
+            if manager.reloads:
+                break
+            manager._stop.wait(0.05)
+        assert manager.reloads == 1 and manager.current().version != before
+    finally:
+        manager.stop()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from gift_recommender.catalog import build_gift_df
+from gift_recommender.catalog_loader import CATALOG_COLUMNS, LIST_FIELDS
+from gift_recommender.compact_catalog import (
+    CompactCatalog,
+    catalog_column,
+    compact_frame,
+    decode_rows,
+    frame_memory_usage,
+)
+
+
+def test_round_trip():
+    df = build_gift_df()
+    back = CompactCatalog.from_frame(df).to_frame()
+    for field in CATALOG_COLUMNS:
+        if field in LIST_FIELDS:
+            assert back[field].tolist() == df[field].tolist()
+        else:
+            assert back[field].astype(str).tolist() == df[field].astype(str).tolist()
+
+
+def test_compact_frame_holds_no_python_objects():
+    df = build_gift_df()
+    compact = compact_frame(df)
+    assert not any(compact[column].dtype == object for column in compact.columns)
+    assert compact.attrs["catalog_version"] == df.attrs["catalog_version"]
+    assert compact.attrs["compact"].memory_usage()["total"] < frame_memory_usage(df)["total"]
+
+
+def test_decode_rows():
+    df = build_gift_df()
+    compact = compact_frame(df)
+    rows = decode_rows(compact.iloc[[5, 0, 3]])
+    assert list(rows.columns[: len(CATALOG_COLUMNS)]) == list(CATALOG_COLUMNS)
+    assert rows["social_tags"].tolist() == df["social_tags"].iloc[[5, 0, 3]].tolist()
+    assert rows["why_base"].tolist() == df["why_base"].iloc[[5, 0, 3]].tolist()
+    # Plain frames pass through untouched
+    plain = df.iloc[[1, 2]]
+    assert decode_rows(plain) is plain
+    pd.testing.assert_series_equal(catalog_column(compact.iloc[[2, 4]], "name"), df["name"].iloc[[2, 4]], check_names=False)
@@ -0,0 +1,163 @@
+import json
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gift_recommender.batch import recommend_batch
+from gift_recommender.catalog import build_gift_df
+from gift_recommender.catalog_loader import CATALOG_COLUMNS
+from gift_recommender.compact_catalog import compact_frame
+from gift_recommender.compiled_catalog import compile_catalog, load_compiled
+from gift_recommender.dataset import build_gift_dataset
+from gift_recommender.incremental import IncrementalScorer
+from gift_recommender.indexes import build_gift_index
+from gift_recommender.materialized import MaterializedTable, build_table
+from gift_recommender.parallel import ParallelScorer
+from gift_recommender.scoring import compute_match_score, compute_match_scores, recommend_gifts
+
+
+# Every engine must return exactly what the plain recommend_gifts scan does:
+# same gifts, same order, bit-identical match_score.
+PROFESSIONS = ["Student", "Engineer", "Teacher", "Doctor", "Artist"]
+HOBBIES = ["Gaming", "Reading", "Sports", "Cooking", "Travel", "Music"]
+SOCIAL_TEXTS = ["", "", "fitness reels", "cozy booktok", "book tok, gym reels", "wfh gadgets", "coffee", "zzzz"]
+
+
+def random_profiles(n, seed):
+    rng = random.Random(seed)
+    return [
+        dict(
+            age=rng.choice([rng.randint(1, 90), rng.randint(1, 90), 150]),
+            gender=rng.choice(["Male", "Female", "Other"]),
+            professions=rng.sample(PROFESSIONS, rng.randint(0, 2)),
+            hobbies=rng.sample(HOBBIES, rng.randint(0, 3)),
+            social_interests=rng.choice(SOCIAL_TEXTS),
+            top_k=rng.choice([1, 5, 10, 30]),
+        )
+        for _ in range(n)
+    ]
+
+
+def assert_same(got, expected):
+    assert got is not None
+    assert list(got.index) == list(expected.index)
+    assert np.array_equal(got["match_score"].to_numpy(), expected["match_score"].to_numpy())
+
+
+@pytest.fixture(scope="module")
+def catalog_file(tmp_path_factory):
+    # The built-in gifts repeated with random trend scores and age ranges, so
+    # ties, age windows and the indexed backfill all get exercised
+    rng = np.random.default_rng(7)
+    df = pd.concat([build_gift_dataset()] * 20, ignore_index=True)
+    df["social_trend_score"] = np.round(rng.uniform(5, 10, len(df)), 1)
+    df["min_age"] = rng.integers(1, 60, len(df))
+    df["max_age"] = df["min_age"] + rng.integers(0, 40, len(df))
+    path = tmp_path_factory.mktemp("catalog") / "gifts.jsonl"
+    with open(path, "w") as fh:
+        for record in df[list(CATALOG_COLUMNS)].to_dict("records"):
+            fh.write(json.dumps(record, default=int) + "\n")
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def catalog(catalog_file):
+    df = build_gift_df(catalog_file)
+    return df, build_gift_index(df)
+
+
+@pytest.fixture(scope="module")
+def expected(catalog):
+    df, _ = catalog
+    return [(p, recommend_gifts(df, **p)) for p in random_profiles(120, seed=1)]
+
+
+def test_indexed_matches_scan(catalog, expected):
+    df, index = catalog
+    for profile, recs in expected:
+        assert_same(recommend_gifts(df, **profile, index=index), recs)
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_empty_top_k(catalog, top_k):
+    df, index = catalog
+    for use_index in (None, index):
+        recs = recommend_gifts(df, 30, "Male", ["Student"], ["Music"], "booktok", top_k=top_k, index=use_index)
+        assert recs.empty and "match_score" in recs
+
+
+def test_scalar_matches_vectorized(catalog):
+    df, index = catalog
+    for p in random_profiles(20, seed=2):
+        args = (p["age"], p["gender"], p["professions"], p["hobbies"], p["social_interests"])
+        scores = compute_match_scores(df, *args, index=index)
+        scalar = np.array([compute_match_score(gift, *args) for _, gift in df.iterrows()])
+        assert np.array_equal(scalar, scores)
+
+
+def test_batch(catalog, expected):
+    df, index = catalog
+    profiles = [p for p, _ in expected if p["top_k"] == 10]
+    results = recommend_batch(df, pd.DataFrame(profiles).drop(columns="top_k"), 10, index, chunk_cells=5000)
+    for profile_id, profile in enumerate(profiles):
+        got = results[results["profile_id"] == profile_id]
+        recs = recommend_gifts(df, **profile)
+        assert list(got["gift_id"]) == list(recs.index)
+        assert np.array_equal(got["match_score"].to_numpy(), recs["match_score"].to_numpy())
+
+
+def test_incremental(catalog, expected):
+    df, index = catalog
+    scorer = IncrementalScorer(df, index)
+    for profile, recs in expected:
+        assert_same(scorer.recommend(**profile), recs)
+
+
+def test_parallel(catalog, expected):
+    df, index = catalog
+    with ParallelScorer(df, index, workers=2, shards=5) as scorer:
+        for profile, recs in expected[:40]:
+            assert_same(scorer.recommend(**profile), recs)
+
+
+def test_materialized(catalog, tmp_path):
+    df, index = catalog
+    # A small table (ages 20-30, four hobbies) keeps the build quick
+    build_table(df, index, str(tmp_path / "table"), top_n=40, ages=(20, 30), hobbies=HOBBIES[:4])
+    table = MaterializedTable(str(tmp_path / "table"))
+    hits = 0
+    for profile in random_profiles(200, seed=3):
+        profile["hobbies"] = [h for h in profile["hobbies"] if h in HOBBIES[:4]]
+        profile["age"] = 20 + profile["age"] % 11
+        got = table.recommend(df, index, **profile)
+        # None means "not settled by the table"; the caller then scores normally
+        if got is not None:
+            hits += 1
+            assert_same(got, recommend_gifts(df, **profile))
+    assert hits > 0
+
+
+def test_compact_frame(catalog, expected):
+    df, index = catalog
+    compact = compact_frame(df)
+    for profile, recs in expected[:40]:
+        for use_index in (None, index):
+            got = recommend_gifts(compact, **profile, index=use_index)
+            assert_same(got, recs)
+            # Decoded rows carry the same catalog columns
+            assert got[list(CATALOG_COLUMNS)].astype(str).equals(recs[list(CATALOG_COLUMNS)].astype(str))
+    scorer = IncrementalScorer(compact, index)
+    for profile, recs in expected[:40]:
+        assert_same(scorer.recommend(**profile), recs)
+
+
+def test_compiled(catalog_file, expected, tmp_path):
+    compile_catalog(str(tmp_path / "compiled"), catalog_file)
+    df, index = load_compiled(str(tmp_path / "compiled"))
+    # Nothing decoded per gift at load
+    assert not any(df[column].dtype == object for column in df.columns)
+    for profile, recs in expected:
+        assert_same(recommend_gifts(df, **profile), recs)
+        assert_same(recommend_gifts(df, **profile, index=index), recs)
@@ -0,0 +1,55 @@
+from gift_recommender.result_cache import TTLCache
+
+
+def make_cache(**kwargs):
+    now = [0.0]
+    cache = TTLCache(clock=lambda: now[0], **kwargs)
+    return cache, now
+
+
+def test_lru_eviction():
+    cache, _ = make_cache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a is now the most recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_ttl_expiry():
+    cache, now = make_cache(ttl_seconds=10.0)
+    cache.put("a", 1)
+    now[0] = 10.0
+    assert cache.get("a") == 1
+    now[0] = 10.5
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["size"]) == (1, 0)
+
+
+def test_catalog_version_invalidates():
+    cache, _ = make_cache()
+    cache.put("a", 1, version="v1")
+    cache.put("b", 2, version="v1")
+    assert cache.get("a", version="v1") == 1
+    assert cache.get("a", version="v2") is None
+    assert cache.get("b", version="v1") is None  # v1 entries went with the switch
+    cache.put("a", 3, version="v2")
+    assert cache.get("a", version="v2") == 3
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["size"]) == (1, 1)
+
+
+def test_counters():
+    cache, _ = make_cache()
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    cache.clear()
+    assert cache.get("a") is None and cache.stats()["size"] == 0
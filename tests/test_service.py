@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from gift_recommender.catalog_manager import CatalogManager
+from gift_recommender.service import MAX_BODY_BYTES, HttpError, RecommendationService
+
+
+PROFILE = {"age": 30, "gender": "Male", "professions": ["Engineer"], "hobbies": ["Music"], "social_interests": ""}
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return CatalogManager()
+
+
+@pytest.fixture
+def service(catalog):
+    svc = RecommendationService(catalog, workers=2, max_pending=2, request_timeout=0.2)
+    yield svc
+    svc._pool.shutdown(wait=True)
+
+
+def blocked(svc):
+    # Make scoring wait until the returned event is set
+    gate = threading.Event()
+    score = svc._recommend
+
+    def slow(profile, top_k):
+        gate.wait(10)
+        return score(profile, top_k)
+
+    svc._recommend = slow
+    return gate
+
+
+async def status(svc, method, path, body):
+    try:
+        return (await svc.dispatch(method, path, body))[0]
+    except HttpError as exc:
+        return exc.status
+
+
+def test_recommend(service):
+    code, payload = asyncio.run(service.dispatch("POST", "/recommend", json.dumps({**PROFILE, "top_k": 3}).encode()))
+    assert code == 200 and len(payload["recommendations"]) == 3
+    assert payload["catalog_version"] == service.catalog.current().version
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"{not json", b"[1, 2]", b'{"age": "x"}', b'{"age": 1e400}', b'{"age": 30, "top_k": 0}', b'{"age": 30, "top_k": "x"}'],
+)
+def test_bad_body_is_400(service, body):
+    assert asyncio.run(status(service, "POST", "/recommend", body)) == 400
+
+
+def test_routes(service):
+    assert asyncio.run(status(service, "POST", "/nope", b"")) == 404
+    assert asyncio.run(status(service, "GET", "/recommend", b"")) == 405
+    assert asyncio.run(status(service, "GET", "/health", b"")) == 200
+
+
+def test_timed_out_job_keeps_its_slot(service):
+    gate = blocked(service)
+    body = json.dumps(PROFILE).encode()
+
+    async def scenario():
+        # Both slots taken by jobs that outlive their requests
+        assert await asyncio.gather(*[status(service, "POST", "/recommend", body) for _ in range(2)]) == [504, 504]
+        assert service._pending == 2
+        # Over max_pending: refused straight away
+        assert await status(service, "POST", "/recommend", body) == 503
+        gate.set()
+        for _ in range(100):
+            if service._pending == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert service._pending == 0
+        assert await status(service, "POST", "/recommend", body) == 200
+
+    asyncio.run(scenario())
+
+
+def http_exchange(service, requests):
+    # Send raw requests over one connection; returns (status, headers, body)
+    # for each response read
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for raw in requests:
+            writer.write(raw)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+            body = await reader.readexactly(int(headers["Content-Length"]))
+            responses.append((int(lines[0].split(" ")[1]), headers, json.loads(body)))
+        at_eof = await reader.read() == b""
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses, at_eof
+
+    return asyncio.run(run())
+
+
+def post(body, close=False):
+    head = f"POST /recommend HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return head.encode() + b"\r\n" + body
+
+
+def test_keep_alive_reuses_connection(service):
+    body = json.dumps(PROFILE).encode()
+    responses, at_eof = http_exchange(service, [post(body), post(b"{not json"), post(body, close=True)])
+    assert [r[0] for r in responses] == [200, 400, 200]
+    assert [r[1]["Connection"] for r in responses] == ["keep-alive", "keep-alive", "close"]
+    assert at_eof
+
+
+def test_oversized_body_is_413(service):
+    raw = f"POST /recommend HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\nConnection: close\r\n\r\n".encode()
+    (response,), _ = http_exchange(service, [raw])
+    assert response[0] == 413
@@ -0,0 +1,83 @@
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+from gift_recommender.catalog import build_gift_df
+from gift_recommender.result_cache import TTLCache
+from gift_recommender.scoring import cached_recommend_gifts, recommend_gifts
+from gift_recommender.shared_cache import SharedCache
+
+
+PROFILE = (30, "Male", ["Student"], ["Music"], "booktok", 5)
+
+
+@pytest.fixture
+def df():
+    return build_gift_df()
+
+
+@pytest.fixture
+def locked(tmp_path):
+    # Another process's connection holding the write lock
+    path = str(tmp_path / "shared.sqlite")
+    SharedCache(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    held = []
+
+    def lock():
+        conn.execute("BEGIN IMMEDIATE")
+        held.append(True)
+
+    yield path, lock
+    if held:
+        conn.execute("ROLLBACK")
+    conn.close()
+
+
+def test_hit_rebuilds_result(df, tmp_path):
+    shared = SharedCache(str(tmp_path / "shared.sqlite"))
+    first = cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    again = cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    assert list(again.index) == list(first.index)
+    assert np.array_equal(again["match_score"].to_numpy(), first["match_score"].to_numpy())
+    assert (shared.hits, shared.misses) == (1, 1)
+
+
+def test_locked_file_never_blocks_or_raises(df, locked):
+    path, lock = locked
+    shared = SharedCache(path)
+    cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    lock()
+
+    start = time.perf_counter()
+    hit = cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    other = cached_recommend_gifts(TTLCache(), df, 50, "Female", [], [], "", 5, shared=shared)
+    assert not shared.evict()
+    stats = shared.stats()
+    assert time.perf_counter() - start < 2.0
+
+    assert shared.hits == 1
+    assert list(hit.index) == list(recommend_gifts(df, *PROFILE).index)
+    assert list(other.index) == list(recommend_gifts(df, 50, "Female", [], [], "", 5).index)
+    assert stats["write_errors"] == 2 and stats["results"] == 1
+
+
+def test_hit_times_are_written_with_the_next_write(df, tmp_path):
+    clock = [1000.0]
+    shared = SharedCache(str(tmp_path / "shared.sqlite"), clock=lambda: clock[0])
+    cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    clock[0] = 1100.0
+    cached_recommend_gifts(TTLCache(), df, *PROFILE, shared=shared)
+    conn = sqlite3.connect(shared.path)
+    assert conn.execute("SELECT used_at FROM results").fetchone()[0] == 1000.0
+    assert shared.evict()
+    assert conn.execute("SELECT used_at FROM results").fetchone()[0] == 1100.0
+
+
+def test_oversized_artifact_is_skipped(tmp_path):
+    shared = SharedCache(str(tmp_path / "shared.sqlite"), max_artifact_bytes=100)
+    assert not shared.put_artifact("big", b"x" * 1000)
+    assert shared.put_artifact("small", b"x")
+    assert shared.get_artifact("big") is None and shared.get_artifact("small") == b"x"
@@ -0,0 +1,48 @@
+from gift_recommender.catalog import build_gift_df
+from gift_recommender.indexes import build_tag_index, match_social_tags, mentions_social_tag, tokenize_social
+from gift_recommender.tag_matcher import TagMatcher
+
+
+def matcher(*phrases):
+    return TagMatcher((tuple(phrase.split()), tag) for phrase, tag in phrases)
+
+
+def test_scan_reports_overlapping_matches():
+    m = matcher(("fitness", "fitness"), ("fitness reels", "fitness-reels"), ("reels", "reels"), ("gym reels", "fitness-reels"))
+    words = "gym fitness reels reels".split()
+    assert sorted(m.scan(words)) == [
+        (1, 2, "fitness"),
+        (1, 3, "fitness-reels"),
+        (2, 3, "reels"),
+        (3, 4, "reels"),
+    ]
+    assert m.tags(words) == ["fitness", "fitness-reels", "reels"]
+
+
+def test_scan_follows_failure_links():
+    # "a b c" fails after "a b" and must still find "b c d"
+    m = matcher(("a b c e", "long"), ("b c d", "mid"), ("c", "short"))
+    assert sorted(m.scan("a b c d".split())) == [(1, 4, "mid"), (2, 3, "short")]
+
+
+def test_matches_fall_on_word_boundaries():
+    m = matcher(("tok", "tok"), ("book", "book"))
+    assert m.scan(["booktok", "tokens"]) == []
+
+
+def test_rewrite_is_leftmost_longest():
+    m = matcher(("book tok", "booktok"), ("tok", "tiktok"), ("cozy", "cozy"), ("cozy book", "reading"))
+    # "cozy book" starts first and wins over "book tok", which overlaps it
+    assert m.rewrite("cozy book tok".split()) == ["reading", "tiktok"]
+    # At the same start, the longer phrase wins
+    assert m.rewrite("book tok now".split()) == ["booktok", "now"]
+    assert m.rewrite([]) == []
+
+
+def test_catalog_matcher_uses_tags_and_synonyms():
+    index = build_tag_index(build_gift_df())
+    assert set(match_social_tags(index, "Book Tok, gym reels and coffee")) >= {"booktok", "fitness-reels", "reels"}
+    assert match_social_tags(index, "zzzz") == []
+    words = tokenize_social("wfh gadgets")
+    for tag in index.social:
+        assert mentions_social_tag(words, tag) == (tag in match_social_tags(index, "wfh gadgets"))